@@ -1,13 +1,51 @@
 """Shared Playwright browser manager with persistent sessions."""
 
 import asyncio
+import http.client
+import shutil
+import threading
+import time
 from pathlib import Path
+from urllib.parse import urljoin, urlsplit
 from playwright.async_api import async_playwright, Browser, BrowserContext, Page, Playwright
 
-from config import USER_DATA_DIR, HEADLESS, VIEWPORT_WIDTH, VIEWPORT_HEIGHT, DEFAULT_TIMEOUT_MS
+from config import (
+    USER_DATA_DIR,
+    USER_DATA_PATH,
+    HEADLESS,
+    VIEWPORT_WIDTH,
+    VIEWPORT_HEIGHT,
+    BROWSER_DISK_CACHE_BYTES,
+    DEFAULT_TIMEOUT_MS,
+    ACTION_TIMEOUT_MS,
+    NAVIGATION_TIMEOUT_MS,
+    DOWNLOAD_CHUNK_BYTES,
+    MAX_OPEN_PAGES,
+    BLOCKED_ASSET_PATTERNS,
+    BLOCKED_MEDIA_PATTERNS,
+    BLOCKED_URL_PATTERNS,
+)
 
 _playwright: Playwright | None = None
 _context: BrowserContext | None = None
+# Serializes context creation so concurrent callers don't launch twice
+_context_lock = asyncio.Lock()
+# Skip the liveness probe if the context was verified this recently
+_CTX_CHECK_TTL_S = 30.0
+_last_ctx_check = 0.0
+# Background context launch started by start_warmup()
+_warmup_task: asyncio.Task | None = None
+# Idle keep-alive connections for download_file, one per (scheme, host)
+_http_pool: dict[tuple[str, str], http.client.HTTPConnection] = {}
+_http_pool_lock = threading.Lock()
+_MAX_REDIRECTS = 5
+# Long-lived pages reused across calls, keyed by caller (see get_or_create_page)
+_pages: dict[str, Page] = {}
+# One lock per _pages key, so concurrent callers (e.g. warmup and a tool
+# call) can't both create a page for it
+_page_locks: dict[str, asyncio.Lock] = {}
+# Caps concurrently open get_page() pages; a slot frees when its page closes
+_page_slots = asyncio.Semaphore(MAX_OPEN_PAGES)
 
 
 async def _ensure_playwright() -> Playwright:
@@ -24,37 +62,156 @@ async def get_context() -> BrowserContext:
     Uses a persistent user data directory so Grok/Sora login sessions
     survive across server restarts.
     """
-    global _context
-    if _context is not None:
-        try:
-            # Verify context is still alive
-            _context.pages
-            return _context
-        except Exception:
-            _context = None
-
-    pw = await _ensure_playwright()
-    user_data = Path(USER_DATA_DIR)
-    user_data.mkdir(parents=True, exist_ok=True)
-
-    _context = await pw.chromium.launch_persistent_context(
-        user_data_dir=str(user_data),
-        headless=HEADLESS,
-        viewport={"width": VIEWPORT_WIDTH, "height": VIEWPORT_HEIGHT},
-        accept_downloads=True,
-        args=[
-            "--disable-blink-features=AutomationControlled",
-        ],
+    global _context, _last_ctx_check
+    if _context is not None and time.monotonic() - _last_ctx_check < _CTX_CHECK_TTL_S:
+        return _context
+
+    async with _context_lock:
+        if _context is not None:
+            try:
+                # Verify context is still alive
+                _context.pages
+                _last_ctx_check = time.monotonic()
+                return _context
+            except Exception:
+                _context = None
+
+        pw = await _ensure_playwright()
+        USER_DATA_PATH.mkdir(parents=True, exist_ok=True)
+
+        _context = await pw.chromium.launch_persistent_context(
+            user_data_dir=USER_DATA_DIR,
+            headless=HEADLESS,
+            viewport={"width": VIEWPORT_WIDTH, "height": VIEWPORT_HEIGHT},
+            accept_downloads=True,
+            args=[
+                "--disable-blink-features=AutomationControlled",
+                f"--disk-cache-size={BROWSER_DISK_CACHE_BYTES}",
+            ],
+        )
+        # Drop the cached context as soon as the browser goes away
+        _context.on("close", _on_context_closed)
+        _last_ctx_check = time.monotonic()
+        return _context
+
+
+def start_warmup(urls: tuple[str, ...] = ()) -> None:
+    """Start launching the browser context in the background.
+
+    Must be called from a running event loop. The first get_context() call
+    simply waits on the same lock, so a tool call that arrives mid-launch
+    picks up the warmed context instead of starting a second one.
+
+    Each of urls is then opened in the tab check_auth() uses for it, so the
+    site's bundles are in the HTTP cache before the first tool call. The
+    generation pages read them from there too: block_heavy_resources blocks
+    by URL rather than with page.route, which would bypass the cache.
+    """
+    global _warmup_task
+    if _warmup_task is None:
+        _warmup_task = asyncio.create_task(_warmup(urls))
+        # A failed warmup is not fatal — get_context() retries on first use
+        _warmup_task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+
+async def _warmup(urls: tuple[str, ...]) -> None:
+    await get_context()
+    await asyncio.gather(
+        *(get_or_create_page(url, key=_auth_page_key(url)) for url in urls),
+        return_exceptions=True,
     )
-    return _context
 
 
-async def get_page(url: str) -> Page:
-    """Open a new page and navigate to the given URL."""
+def _auth_page_key(url: str) -> str:
+    return f"auth:{url}"
+
+
+def _on_context_closed(ctx: BrowserContext) -> None:
+    global _context
+    if _context is ctx:
+        _context = None
+
+
+async def block_heavy_resources(page: Page, keep_media: bool = False) -> None:
+    """Block images/fonts/media and analytics beacons on page by URL.
+
+    Uses CDP's Network.setBlockedURLs instead of page.route, so the page
+    keeps the HTTP cache (routed pages bypass it). Pass keep_media=True to
+    let audio/video through. Data: URIs are never blocked.
+    """
+    patterns = [*BLOCKED_ASSET_PATTERNS, *BLOCKED_URL_PATTERNS]
+    if not keep_media:
+        patterns += BLOCKED_MEDIA_PATTERNS
+    session = await page.context.new_cdp_session(page)
+    await session.send("Network.enable")
+    await session.send("Network.setBlockedURLs", {"urls": patterns})
+
+
+async def _new_page(block_resources: bool, keep_media: bool = False) -> Page:
+    """Open a blank page in the shared context with our defaults applied."""
     ctx = await get_context()
     page = await ctx.new_page()
-    page.set_default_timeout(DEFAULT_TIMEOUT_MS)
-    await page.goto(url, wait_until="domcontentloaded")
+    # Fail fast on actions against selectors that should already be there
+    page.set_default_timeout(ACTION_TIMEOUT_MS)
+    page.set_default_navigation_timeout(NAVIGATION_TIMEOUT_MS)
+    if block_resources:
+        await block_heavy_resources(page, keep_media)
+    return page
+
+
+async def get_page(
+    url: str, block_resources: bool = False, keep_media: bool = False, take_slot: bool = True
+) -> Page:
+    """Open a new page and navigate to the given URL.
+
+    Returns as soon as the navigation commits; callers wait for the
+    selector they actually need rather than for the full document parse.
+    At most MAX_OPEN_PAGES of these are open at once — further callers
+    wait until one is closed. The browser context itself stays warm.
+
+    With block_resources=True, images, fonts, media and analytics requests
+    are blocked (see block_heavy_resources); pass keep_media=True as well to
+    let audio/video through. Data: URIs are never blocked, so in-page
+    generated images still render.
+
+    Pass take_slot=False for a short-lived helper page opened by a flow that
+    already holds a slot; waiting for a second slot could deadlock once
+    every slot is held by a flow doing the same.
+    """
+    if take_slot:
+        await _page_slots.acquire()
+        try:
+            page = await _new_page(block_resources, keep_media)
+        except BaseException:
+            _page_slots.release()
+            raise
+        page.once("close", lambda _: _page_slots.release())
+    else:
+        page = await _new_page(block_resources, keep_media)
+
+    try:
+        await page.goto(url, wait_until="commit")
+    except BaseException:
+        await close_page(page)
+        raise
+    return page
+
+
+async def get_or_create_page(url: str, key: str, block_resources: bool = False) -> Page:
+    """Navigate a long-lived page (one per key) to the given URL.
+
+    Repeated callers reuse the same tab, keeping its renderer, HTTP cache
+    and service workers warm instead of paying for a new page each time.
+    Cached pages are closed by shutdown(), not by callers.
+    """
+    async with _page_locks.setdefault(key, asyncio.Lock()):
+        page = _pages.get(key)
+        if page is None or page.is_closed():
+            # Cached pages don't count against MAX_OPEN_PAGES
+            page = await _new_page(block_resources)
+            _pages[key] = page
+
+        await page.goto(url, wait_until="commit")
     return page
 
 
@@ -69,21 +226,121 @@ async def wait_for_element(
         return False
 
 
+async def wait_for_condition(
+    page: Page,
+    predicate_js: str,
+    timeout_ms: int,
+    arg=None,
+    initial_interval_s: float = 0.1,
+    max_interval_s: float = 2.0,
+) -> bool:
+    """Poll a JS predicate until it returns truthy. Returns True if it did.
+
+    The interval starts at initial_interval_s and doubles up to
+    max_interval_s, so fast conditions resolve in ~100ms while slow ones
+    are not hammered. A predicate that throws (e.g. mid-navigation) counts
+    as false.
+    """
+    deadline = time.monotonic() + timeout_ms / 1000
+    interval = initial_interval_s
+    while True:
+        try:
+            if await page.evaluate(predicate_js, arg):
+                return True
+        except Exception:
+            pass
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        await asyncio.sleep(min(interval, remaining))
+        interval = min(interval * 2, max_interval_s)
+
+
 async def screenshot(page: Page, path: str | None = None) -> bytes:
     """Take a screenshot of the page. Returns bytes, optionally saves to path."""
     return await page.screenshot(path=path, full_page=False)
 
 
 async def download_file(page: Page, url: str, output_path: str) -> str:
-    """Download a file from a URL using the page's fetch context."""
-    response = await page.request.get(url)
-    content = await response.body()
+    """Download a file from a URL, streaming it to disk.
+
+    Uses the page's cookies and user agent so authenticated URLs resolve
+    the same as in the browser, but never holds the whole body in memory.
+    Connections are kept alive per host, so repeat downloads skip the
+    TCP/TLS handshake. The file is written to a .part sibling and renamed
+    once complete.
+    """
+    headers = {"User-Agent": await page.evaluate("navigator.userAgent")}
+    cookies = await page.context.cookies(url)
+    if cookies:
+        headers["Cookie"] = "; ".join(f"{c['name']}={c['value']}" for c in cookies)
+
     out = Path(output_path)
     out.parent.mkdir(parents=True, exist_ok=True)
-    out.write_bytes(content)
+    await asyncio.to_thread(_stream_to_file, url, headers, out)
     return str(out)
 
 
+def _stream_to_file(url: str, headers: dict, out: Path) -> None:
+    """Blocking chunked copy of url into out (run via asyncio.to_thread)."""
+    partial = out.with_name(out.name + ".part")
+    origin = urlsplit(url).netloc
+    try:
+        for _ in range(_MAX_REDIRECTS + 1):
+            # Never forward cookies to a host other than the one they came from
+            if urlsplit(url).netloc != origin:
+                headers = {k: v for k, v in headers.items() if k != "Cookie"}
+            key, conn, response = _pooled_get(url, headers)
+            try:
+                if response.status in (301, 302, 303, 307, 308):
+                    url = urljoin(url, response.getheader("Location", ""))
+                    response.read()
+                    continue
+                if response.status >= 400:
+                    raise RuntimeError(f"Download failed: HTTP {response.status} for {url}")
+                with open(partial, "wb") as f:
+                    shutil.copyfileobj(response, f, DOWNLOAD_CHUNK_BYTES)
+                partial.replace(out)
+                return
+            finally:
+                _release_connection(key, conn, response)
+        raise RuntimeError(f"Download failed: too many redirects for {url}")
+    finally:
+        partial.unlink(missing_ok=True)
+
+
+def _pooled_get(url: str, headers: dict):
+    """GET url on a pooled keep-alive connection. Returns (key, conn, response)."""
+    parts = urlsplit(url)
+    key = (parts.scheme, parts.netloc)
+    target = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+
+    with _http_pool_lock:
+        conn = _http_pool.pop(key, None)
+    if conn is not None:
+        try:
+            conn.request("GET", target, headers=headers)
+            return key, conn, conn.getresponse()
+        except (http.client.HTTPException, OSError):
+            # The server dropped the idle connection — fall through to a fresh one
+            conn.close()
+
+    conn_cls = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+    conn = conn_cls(parts.netloc, timeout=DEFAULT_TIMEOUT_MS / 1000)
+    conn.request("GET", target, headers=headers)
+    return key, conn, conn.getresponse()
+
+
+def _release_connection(key, conn, response) -> None:
+    """Return conn to the pool if it can be reused, otherwise close it."""
+    if response.isclosed() and not response.will_close:
+        with _http_pool_lock:
+            if key not in _http_pool:
+                _http_pool[key] = conn
+                return
+    conn.close()
+
+
 async def close_page(page: Page) -> None:
     """Close a page without closing the browser context."""
     try:
@@ -98,15 +355,11 @@ async def check_auth(url: str, auth_indicator_selector: str) -> dict:
     Returns { authenticated: bool, message: str }.
     """
     try:
-        page = await get_page(url)
-        # Give the page a moment to settle after navigation
-        await asyncio.sleep(2)
-
+        page = await get_or_create_page(url, key=_auth_page_key(url))
+        # The element wait returns as soon as the indicator renders
         found = await wait_for_element(page, auth_indicator_selector, timeout_ms=10_000)
         current_url = page.url
 
-        await close_page(page)
-
         if found:
             return {"authenticated": True, "message": f"Session active at {current_url}"}
         else:
@@ -118,9 +371,34 @@ async def check_auth(url: str, auth_indicator_selector: str) -> dict:
         return {"authenticated": False, "message": f"Error checking auth: {str(e)}"}
 
 
+async def check_auth_many(targets: dict[str, tuple[str, str]]) -> dict[str, dict]:
+    """Run several check_auth probes concurrently.
+
+    targets maps a name to (url, auth_indicator_selector). Returns
+    { name: { authenticated: bool, message: str } }.
+    """
+    async with asyncio.TaskGroup() as tg:
+        tasks = {
+            name: tg.create_task(check_auth(url, selector))
+            for name, (url, selector) in targets.items()
+        }
+    return {name: task.result() for name, task in tasks.items()}
+
+
 async def shutdown() -> None:
-    """Close browser context and Playwright."""
-    global _context, _playwright
+    """Close cached pages, browser context and Playwright."""
+    global _context, _playwright, _warmup_task
+    if _warmup_task is not None:
+        if not _warmup_task.done():
+            _warmup_task.cancel()
+        _warmup_task = None
+    for page in _pages.values():
+        await close_page(page)
+    _pages.clear()
+    with _http_pool_lock:
+        for conn in _http_pool.values():
+            conn.close()
+        _http_pool.clear()
     if _context:
         try:
             await _context.close()
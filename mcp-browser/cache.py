@@ -0,0 +1,66 @@
+"""Persistent cache of generated media, keyed by the generation inputs.
+
+Maps sha256(inputs) to the file a previous run produced. An entry is only
+served while it is younger than GENERATION_CACHE_TTL_S and the file on disk
+still has the content hash recorded when it was stored.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from pathlib import Path
+
+from config import GENERATION_CACHE_PATH, GENERATION_CACHE_TTL_S, DOWNLOAD_CHUNK_BYTES
+
+# store() runs in worker threads (asyncio.to_thread); its read-modify-write
+# and shared .tmp file must not interleave, or one write loses the other's entry
+_store_lock = threading.Lock()
+
+
+def make_key(*parts) -> str:
+    """Content-addressed key for a set of generation inputs."""
+    return hashlib.sha256("|".join(str(p) for p in parts).encode()).hexdigest()
+
+
+def lookup(key: str) -> str | None:
+    """Return the cached file path for key, or None if missing, stale or modified."""
+    entry = _load().get(key)
+    if entry is None or time.time() - entry["created_at"] > GENERATION_CACHE_TTL_S:
+        return None
+    path = Path(entry["path"])
+    if not path.is_file() or _sha256_file(path) != entry["sha256"]:
+        return None
+    return str(path)
+
+
+def store(key: str, path: str) -> None:
+    """Record path as the result for key, dropping expired entries."""
+    # Hash outside the lock; only the JSON update needs serializing
+    sha256 = _sha256_file(Path(path))
+    with _store_lock:
+        now = time.time()
+        entries = {
+            k: v for k, v in _load().items() if now - v["created_at"] <= GENERATION_CACHE_TTL_S
+        }
+        entries[key] = {"path": path, "created_at": now, "sha256": sha256}
+
+        GENERATION_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        tmp = GENERATION_CACHE_PATH.with_name(GENERATION_CACHE_PATH.name + ".tmp")
+        tmp.write_text(json.dumps(entries))
+        tmp.replace(GENERATION_CACHE_PATH)
+
+
+def _load() -> dict:
+    try:
+        return json.loads(GENERATION_CACHE_PATH.read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def _sha256_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(DOWNLOAD_CHUNK_BYTES):
+            digest.update(chunk)
+    return digest.hexdigest()
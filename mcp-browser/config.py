@@ -7,21 +7,36 @@ GROK_URL = "https://grok.com/imagine"
 SORA_STORYBOARD_URL = "https://sora.chatgpt.com/storyboard"
 SORA_DRAFTS_URL = "https://sora.chatgpt.com/drafts"
 
-USER_DATA_DIR = str(Path.home() / ".smi-browser")
+USER_DATA_PATH = Path.home() / ".smi-browser"
+USER_DATA_DIR = str(USER_DATA_PATH)
 
 # Timeouts
 DEFAULT_TIMEOUT_MS = 120_000
+# Per-page defaults for clicks/fills and navigations; explicit waits on
+# slow things (generation, polling) pass their own timeout
+ACTION_TIMEOUT_MS = 5_000
+NAVIGATION_TIMEOUT_MS = 15_000
 # Sora generation can take 10+ minutes — allow up to 30 minutes
 SORA_TIMEOUT_MS = 1_800_000
 
+# Optional lossy re-encode of Grok output, done in-page before transfer
+GROK_COMPRESS_FORMAT = "webp"  # "webp" or "jpeg"
+GROK_COMPRESS_QUALITY = 0.85
+
+# Generated files are reused for identical inputs within this window
+GENERATION_CACHE_PATH = Path.home() / ".smi-browser-cache" / "generations.json"
+GENERATION_CACHE_TTL_S = 24 * 3600
+
+# Downloads are streamed to disk in chunks of this size
+DOWNLOAD_CHUNK_BYTES = 64 * 1024
+
 # Retry settings
 RETRY_ATTEMPTS = 3
 RETRY_DELAY_S = 10
 SORA_RETRY_DELAY_S = 30
 
 # Polling intervals
-SCREENSHOT_POLL_INTERVAL_S = 3
-# Poll drafts page every 30 seconds (generation takes 5-10 min)
+# Reload the drafts page if it goes 30s without refreshing itself (generation takes 5-10 min)
 SORA_DRAFT_POLL_INTERVAL_S = 30
 
 # Browser settings
@@ -29,3 +44,29 @@ SORA_DRAFT_POLL_INTERVAL_S = 30
 HEADLESS = False
 VIEWPORT_WIDTH = 1280
 VIEWPORT_HEIGHT = 900
+# Chromium's HTTP cache lives in the persistent profile; give it room for
+# the Grok/Sora bundles so restarts load them from disk. Every page uses it,
+# including the resource-blocked ones, since blocking never routes requests
+BROWSER_DISK_CACHE_BYTES = 256 * 1024 * 1024
+# Max transient pages (browser.get_page) open at once; extra callers wait
+MAX_OPEN_PAGES = 3
+
+# Request blocking for automated pages (see browser.block_heavy_resources).
+# Blocked by URL through CDP rather than page.route: Playwright turns the
+# HTTP cache off for any routed page, which would defeat the disk cache and
+# warmup above. The cost is that matching is by URL only, so images, fonts
+# or media served without a file extension still load.
+# Stylesheets are left alone — innerText and visibility waits depend on them
+BLOCKED_ASSET_PATTERNS = (
+    "*.png*", "*.jpg*", "*.jpeg*", "*.gif*", "*.webp*", "*.avif*",
+    "*.woff*", "*.ttf*", "*.otf*",
+)
+BLOCKED_MEDIA_PATTERNS = ("*.mp4*", "*.webm*", "*.m3u8*", "*.mov*")
+BLOCKED_URL_PATTERNS = (
+    "*facebook.com/ajax/bz*",
+    "*/tr/*",
+    "*analytics*",
+    "*sentry.io*",
+    "*segment.io*",
+    "*googletagmanager.com*",
+)
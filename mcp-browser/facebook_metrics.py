@@ -5,40 +5,133 @@ and extracts per-post metrics from all visible rows.
 """
 
 import asyncio
-import re
 import time
-from browser import get_page, close_page, wait_for_element
+from browser import get_or_create_page, wait_for_element
+from page_objects import FbContentLibraryPage
 
 FB_CONTENT_LIBRARY = "https://www.facebook.com/professional_dashboard/content/content_library/"
 
 # Timeout for initial page load
 PAGE_LOAD_TIMEOUT_MS = 30_000
 
+# Lazy-loaded rows are considered done once the table body has been quiet
+# for ROWS_SETTLE_MS, capped at ROWS_LOAD_TIMEOUT_MS overall
+ROWS_SETTLE_MS = 1_000
+ROWS_LOAD_TIMEOUT_MS = 10_000
+
+# Scrolls to the bottom whenever new rows arrive and resolves with the row
+# count once no rows have been added for settleMs (or after timeoutMs)
+_LOAD_ALL_ROWS_JS = """(table, [settleMs, timeoutMs]) => new Promise(resolve => {
+    const target = table.querySelector('tbody') || table;
+    const count = () => table.querySelectorAll('tbody tr').length;
+    let settleTimer, hardTimer;
+    const observer = new MutationObserver(() => {
+        window.scrollTo(0, document.body.scrollHeight);
+        clearTimeout(settleTimer);
+        settleTimer = setTimeout(done, settleMs);
+    });
+    function done() {
+        observer.disconnect();
+        clearTimeout(settleTimer);
+        clearTimeout(hardTimer);
+        resolve(count());
+    }
+    observer.observe(target, { childList: true, subtree: true });
+    window.scrollTo(0, document.body.scrollHeight);
+    settleTimer = setTimeout(done, settleMs);
+    hardTimer = setTimeout(done, timeoutMs);
+})"""
+
+
+# Extracts and parses every row in one pass — numbers are parsed in-page so
+# only typed post dicts cross back over CDP
+_EXTRACT_POSTS_JS = """(table) => {
+    // Shared by every row and cell, so built once per scrape
+    const UNICODE_SPACES = /[\\u00a0\\u202f\\u2009\\u200a]/g;
+    const PUBLISHED = /^(.*)Published\\s*[•·]\\s*(.+)$/s;
+    const VIDEO_STORY = /Video story/i;
+    const VIDEO_STORY_PREFIX = /^Video story\\s*/i;
+    const REEL_HINT = /watch_time|Reel/i;
+    const EMPTY = new Set(['--', '', '-']);
+    const COMMAS = /,/g;
+    const X_SUFFIX = /x/g;
+    const INTEGER = /^[+-]?\\d+$/;
+
+    // Normalize unicode spaces to regular spaces
+    function norm(s) {
+        return s.replace(UNICODE_SPACES, ' ').trim();
+    }
+
+    // '999', '6,069,415', '--' -> int (0 for empty or unparseable)
+    function parseNum(t) {
+        if (t === undefined || EMPTY.has(t)) return 0;
+        t = t.replace(COMMAS, '');
+        return INTEGER.test(t) ? parseInt(t, 10) : 0;
+    }
+
+    // '+0.3x', '-0.3x' -> float, '--' -> null
+    function parseDist(t) {
+        if (t === undefined || EMPTY.has(t)) return null;
+        const v = Number(t.replace(X_SUFFIX, ''));
+        return Number.isFinite(v) ? v : null;
+    }
+
+    const rows = Array.from(table.querySelectorAll('tbody tr'));
+    return rows.map(row => {
+        const cells = Array.from(row.querySelectorAll('td'));
+
+        const previewCell = cells[1] || null;
+        let caption = '';
+        let publishedAt = '';
+        let postType = 'post';
+
+        if (previewCell) {
+            const rawText = previewCell.innerText || '';
+            const text = norm(rawText);
+
+            // Split on "Published" to separate caption from date
+            const pubMatch = text.match(PUBLISHED);
+            if (pubMatch) {
+                caption = pubMatch[1].trim();
+                publishedAt = pubMatch[2].trim();
+            } else {
+                caption = text;
+            }
 
-def parse_number(text: str) -> int:
-    """Parse a metric number string like '999', '6,069,415', '--' into an int."""
-    text = text.strip()
-    if text in ("--", "", "-"):
-        return 0
-    # Remove commas
-    text = text.replace(",", "")
-    try:
-        return int(text)
-    except ValueError:
-        return 0
-
-
-def parse_distribution(text: str) -> float | None:
-    """Parse distribution like '+0.3x', '-0.3x' into a float. Returns None for '--'."""
-    text = text.strip()
-    if text in ("--", "", "-"):
-        return None
-    # Remove the 'x' suffix
-    text = text.replace("x", "")
-    try:
-        return float(text)
-    except ValueError:
-        return None
+            // Detect post type
+            if (VIDEO_STORY.test(text)) {
+                postType = 'story';
+                caption = caption.replace(VIDEO_STORY_PREFIX, '').trim();
+            } else if (REEL_HINT.test(text)) {
+                postType = 'reel';
+            }
+        }
+
+        // Metric cells (indices 3-10); trailing columns are never read
+        const m = cells.slice(3, 11).map(c => norm(c.textContent || ''));
+
+        const watchTime = parseNum(m[7]);
+
+        // FB merged videos into reels — if it has watch time and isn't a story, it's a reel
+        if (postType === 'post' && watchTime > 0) {
+            postType = 'reel';
+        }
+
+        return {
+            caption,
+            post_type: postType,
+            published_at: publishedAt,
+            views: parseNum(m[0]),
+            viewers: parseNum(m[1]),
+            engagement: parseNum(m[2]),
+            net_follows: parseNum(m[3]),
+            impressions: parseNum(m[4]),
+            comments: parseNum(m[5]),
+            distribution: parseDist(m[6]),
+            watch_time_ms: watchTime,
+        };
+    });
+}"""
 
 
 async def scrape_facebook_content_library() -> dict:
@@ -67,28 +160,30 @@ async def scrape_facebook_content_library() -> dict:
         }
     """
     start = time.time()
-    page = None
 
     try:
-        page = await get_page(FB_CONTENT_LIBRARY)
+        # Only the metrics table matters — skip images, fonts and trackers
+        page = await get_or_create_page(
+            FB_CONTENT_LIBRARY, key="fb_metrics", block_resources=True
+        )
+
+        library = FbContentLibraryPage(page)
 
         # Wait for the content library table to appear
         table_found = await wait_for_element(
             page,
-            '[aria-label="Content Library"]',
+            FbContentLibraryPage.TABLE,
             timeout_ms=PAGE_LOAD_TIMEOUT_MS,
         )
         if not table_found:
             # Check if we hit a login page
             if "login" in page.url.lower():
-                await close_page(page)
                 return {
                     "success": False,
                     "posts": [],
                     "scraped_at": _iso_now(),
                     "error": "Not logged in. Run with SMI_HEADLESS=false and log in manually.",
                 }
-            await close_page(page)
             return {
                 "success": False,
                 "posts": [],
@@ -100,97 +195,11 @@ async def scrape_facebook_content_library() -> dict:
         await asyncio.sleep(2)
 
         # Scroll to load all posts (FB may lazy-load)
-        prev_count = 0
-        for _ in range(10):
-            await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-            await asyncio.sleep(1)
-            curr_count = await page.evaluate("""() => {
-                const table = document.querySelector('[aria-label="Content Library"]');
-                return table ? table.querySelectorAll('tbody tr').length : 0;
-            }""")
-            if curr_count == prev_count:
-                break
-            prev_count = curr_count
-
-        # Extract all row data
-        raw_rows = await page.evaluate("""() => {
-            // Normalize unicode spaces to regular spaces
-            function norm(s) {
-                return s.replace(/[\\u00a0\\u202f\\u2009\\u200a]/g, ' ').trim();
-            }
+        await library.table.evaluate(_LOAD_ALL_ROWS_JS, [ROWS_SETTLE_MS, ROWS_LOAD_TIMEOUT_MS])
 
-            const table = document.querySelector('[aria-label="Content Library"]');
-            if (!table) return [];
-
-            const rows = Array.from(table.querySelectorAll('tbody tr'));
-            return rows.map(row => {
-                const cells = Array.from(row.querySelectorAll('td'));
-
-                const previewCell = cells[1] || null;
-                let caption = '';
-                let publishedAt = '';
-                let postType = 'post';
-
-                if (previewCell) {
-                    const rawText = previewCell.innerText || '';
-                    const text = norm(rawText);
-
-                    // Split on "Published" to separate caption from date
-                    const pubMatch = text.match(/^(.*)Published\\s*[•·]\\s*(.+)$/s);
-                    if (pubMatch) {
-                        caption = pubMatch[1].trim();
-                        publishedAt = pubMatch[2].trim();
-                    } else {
-                        caption = text;
-                    }
-
-                    // Detect post type
-                    if (/^Video story/i.test(caption) || /Video story/i.test(text)) {
-                        postType = 'story';
-                        caption = caption.replace(/^Video story\\s*/i, '').trim();
-                    } else if (/watch_time/i.test(text) || /Reel/i.test(text)) {
-                        postType = 'reel';
-                    }
-                    // Videos on FB are now reels — detected later via watch_time > 0
-                }
-
-                // Metric cells (indices 3-10)
-                const metricValues = [];
-                for (let i = 3; i < cells.length; i++) {
-                    metricValues.push(norm(cells[i]?.textContent || ''));
-                }
-
-                return { caption, publishedAt, postType, metrics: metricValues };
-            });
-        }""")
-
-        # Parse into structured data
-        posts = []
-        for row in raw_rows:
-            metrics = row.get("metrics", [])
-            watch_time = parse_number(metrics[7] if len(metrics) > 7 else "0")
-            post_type = row.get("postType", "post")
-
-            # FB merged videos into reels — if it has watch time and isn't a story, it's a reel
-            if post_type == "post" and watch_time > 0:
-                post_type = "reel"
-
-            post = {
-                "caption": row.get("caption", ""),
-                "post_type": post_type,
-                "published_at": row.get("publishedAt", ""),
-                "views": parse_number(metrics[0] if len(metrics) > 0 else "0"),
-                "viewers": parse_number(metrics[1] if len(metrics) > 1 else "0"),
-                "engagement": parse_number(metrics[2] if len(metrics) > 2 else "0"),
-                "net_follows": parse_number(metrics[3] if len(metrics) > 3 else "0"),
-                "impressions": parse_number(metrics[4] if len(metrics) > 4 else "0"),
-                "comments": parse_number(metrics[5] if len(metrics) > 5 else "0"),
-                "distribution": parse_distribution(metrics[6] if len(metrics) > 6 else "--"),
-                "watch_time_ms": watch_time,
-            }
-            posts.append(post)
+        # Extract and parse all rows in one pass
+        posts = await library.table.evaluate(_EXTRACT_POSTS_JS)
 
-        await close_page(page)
         elapsed = round((time.time() - start) * 1000)
 
         return {
@@ -202,8 +211,6 @@ async def scrape_facebook_content_library() -> dict:
         }
 
     except Exception as e:
-        if page:
-            await close_page(page)
         return {
             "success": False,
             "posts": [],
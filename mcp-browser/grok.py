@@ -1,10 +1,10 @@
 """Grok Imagine workflow.
 
 Tested against grok.com/imagine (2026-02-18):
-- Input: [contenteditable="true"] (tiptap ProseMirror), typed via keyboard.type()
+- Input: [contenteditable="true"] (tiptap ProseMirror), filled via a synthetic paste
 - Submit: button[aria-label="Submit"]
 - After submit: page shows results with img[alt="Generated image"]
-  containing base64 data URIs. Wait 10s for full-res to load, then decode.
+  containing base64 data URIs. Poll until full-res has loaded, then decode.
 """
 
 import asyncio
@@ -12,41 +12,140 @@ import base64
 import time
 from pathlib import Path
 
-from browser import get_page, wait_for_element, close_page
+from playwright.async_api import Error as PlaywrightError
+
+from browser import get_page, wait_for_element, wait_for_condition, close_page
+from page_objects import GrokPage
 from config import (
     GROK_URL,
     RETRY_ATTEMPTS,
     RETRY_DELAY_S,
-    SCREENSHOT_POLL_INTERVAL_S,
     DEFAULT_TIMEOUT_MS,
+    GROK_COMPRESS_FORMAT,
+    GROK_COMPRESS_QUALITY,
 )
 
+# Full-res base64 images are 200K-300K chars; anything shorter is a placeholder
+FULL_RES_MIN_SRC_LEN = 150_000
+
+# Evaluate errors that mean the page navigated mid-wait, so re-arming is safe
+_NAVIGATION_ERRORS = ("Execution context was destroyed", "Cannot find context with specified id")
+
+# The editor has rendered, or the app redirected to login; either ends the
+# wait, so a logged-out session is reported instead of timing out on the editor
+_EDITOR_READY_JS = """(sel) =>
+    /login|oauth/.test(location.href) || !!document.querySelector(sel)
+"""
+
+# File suffix for each supported compress_format
+_COMPRESS_SUFFIXES = {"webp": ".webp", "jpeg": ".jpg"}
+
+# Resolves with just the base64 payload of the first full-res result image,
+# so placeholder srcs and the data: prefix never cross over CDP. Re-checks on
+# every DOM/src mutation and resolves null after timeoutMs. When a format is
+# given, the image is re-encoded in-page first so fewer bytes are transferred;
+# if that fails, the original (uncompressed) payload is returned instead.
+_WAIT_FULL_RES_PAYLOAD_JS = """async ([sel, minLen, timeoutMs, format, quality]) => {
+    const img = await new Promise(resolve => {
+        const find = () => {
+            for (const img of document.querySelectorAll(sel)) {
+                const src = img.getAttribute('src') || '';
+                if (src.startsWith('data:image/') && src.length > minLen) return img;
+            }
+            return null;
+        };
+        const found = find();
+        if (found) return resolve(found);
+
+        const finish = (value) => {
+            observer.disconnect();
+            clearTimeout(timer);
+            resolve(value);
+        };
+        const observer = new MutationObserver(() => {
+            const match = find();
+            if (match) finish(match);
+        });
+        observer.observe(document.body, {
+            subtree: true,
+            childList: true,
+            attributes: true,
+            attributeFilter: ['src'],
+        });
+        const timer = setTimeout(() => finish(null), timeoutMs);
+    });
+    if (!img) return null;
+
+    let dataUrl = img.getAttribute('src');
+    if (format) {
+        // A decode/encode failure keeps the original bytes rather than
+        // failing the whole wait
+        try {
+            await img.decode();
+            const bitmap = await createImageBitmap(img);
+            const canvas = new OffscreenCanvas(bitmap.width, bitmap.height);
+            canvas.getContext('2d').drawImage(bitmap, 0, 0);
+            const blob = await canvas.convertToBlob({ type: 'image/' + format, quality });
+            dataUrl = await new Promise((resolve, reject) => {
+                const reader = new FileReader();
+                reader.onload = () => resolve(reader.result);
+                reader.onerror = () => reject(reader.error);
+                reader.readAsDataURL(blob);
+            });
+        } catch (err) {
+            dataUrl = img.getAttribute('src');
+        }
+    }
+    return dataUrl.slice(dataUrl.indexOf(',') + 1);
+}"""
+
 
 async def generate_grok_image(
     prompt: str,
     output_path: str,
     aspect_ratio: str = "1:1",
+    compress: bool = False,
+    compress_format: str = GROK_COMPRESS_FORMAT,
+    compress_quality: float = GROK_COMPRESS_QUALITY,
 ) -> dict:
     """Generate an image via Grok Imagine.
 
     1. Navigate to grok.com/imagine
-    2. Type prompt into the contenteditable editor
+    2. Paste prompt into the contenteditable editor
     3. Click Submit
-    4. Wait 10s+ for images to fully render
+    4. Wait for result images, then poll until one is fully rendered
     5. Decode the base64 data from the first result image's src
     6. Save to output_path
 
+    With compress=True the image is re-encoded in the browser as
+    compress_format ("webp" or "jpeg") at compress_quality (0-1) before it is
+    transferred, and output_path's suffix is changed to match.
+
     Returns:
         { success: bool, path: str, generation_time_ms: int, error?: str }
     """
+    out = Path(output_path)
+    if compress:
+        if compress_format not in _COMPRESS_SUFFIXES:
+            return {
+                "success": False,
+                "path": "",
+                "generation_time_ms": 0,
+                "error": f"Unsupported compress_format: {compress_format!r}",
+            }
+        out = out.with_suffix(_COMPRESS_SUFFIXES[compress_format])
+
     last_error = ""
 
     for attempt in range(1, RETRY_ATTEMPTS + 1):
         page = None
         try:
             start_time = time.time()
-            page = await get_page(GROK_URL)
-            await asyncio.sleep(3)
+            # Results are data: URIs, so page images/fonts/trackers can all go
+            page = await get_page(GROK_URL, block_resources=True)
+            await wait_for_condition(
+                page, _EDITOR_READY_JS, timeout_ms=15_000, arg=GrokPage.EDITOR
+            )
 
             # Check for login redirect
             if "login" in page.url or "oauth" in page.url:
@@ -57,9 +156,10 @@ async def generate_grok_image(
                     continue
                 break
 
+            grok = GrokPage(page)
+
             # Wait for the contenteditable prompt editor
-            editor_sel = '[contenteditable="true"]'
-            found = await wait_for_element(page, editor_sel, timeout_ms=15_000)
+            found = await wait_for_element(page, GrokPage.EDITOR, timeout_ms=15_000)
             if not found:
                 last_error = "Could not find prompt editor on Grok Imagine page"
                 if attempt < RETRY_ATTEMPTS:
@@ -68,17 +168,11 @@ async def generate_grok_image(
                     continue
                 break
 
-            # Type the prompt
-            editor = await page.query_selector(editor_sel)
-            await editor.click()
-            await page.keyboard.press("Control+a")
-            await page.keyboard.press("Backspace")
-            await page.keyboard.type(prompt, delay=10)
-            await asyncio.sleep(0.5)
+            # Enter the prompt
+            await grok.enter_prompt(prompt)
 
             # Click submit
-            submit = await page.query_selector('button[aria-label="Submit"]')
-            if not submit:
+            if await grok.submit.count() == 0:
                 last_error = "Could not find Submit button"
                 if attempt < RETRY_ATTEMPTS:
                     await close_page(page)
@@ -86,12 +180,17 @@ async def generate_grok_image(
                     continue
                 break
 
-            await submit.click()
+            await grok.submit.click()
 
-            # Wait 20s for images to fully render, then poll for full-res base64
-            await asyncio.sleep(20)
+            # Wait for the first result tile, then poll until it's full-res base64
+            await grok.images.first.wait_for(timeout=30_000)
 
-            image_data = await _poll_for_loaded_image(page, timeout_ms=DEFAULT_TIMEOUT_MS)
+            image_data = await _poll_for_loaded_image(
+                page,
+                timeout_ms=DEFAULT_TIMEOUT_MS,
+                compress_format=compress_format if compress else None,
+                compress_quality=compress_quality,
+            )
             if not image_data:
                 last_error = "No full-res image found after generation"
                 if attempt < RETRY_ATTEMPTS:
@@ -100,17 +199,16 @@ async def generate_grok_image(
                     continue
                 break
 
-            # Save the image
-            out = Path(output_path)
+            # Save the image off the event loop
             out.parent.mkdir(parents=True, exist_ok=True)
-            out.write_bytes(image_data)
+            await asyncio.to_thread(out.write_bytes, image_data)
 
             elapsed_ms = int((time.time() - start_time) * 1000)
             await close_page(page)
 
             return {
                 "success": True,
-                "path": output_path,
+                "path": str(out),
                 "generation_time_ms": elapsed_ms,
             }
 
@@ -129,22 +227,40 @@ async def generate_grok_image(
     }
 
 
-async def _poll_for_loaded_image(page, timeout_ms: int) -> bytes | None:
-    """Poll until a full-res img[alt='Generated image'] is available.
+async def _poll_for_loaded_image(
+    page,
+    timeout_ms: int,
+    compress_format: str | None = None,
+    compress_quality: float = GROK_COMPRESS_QUALITY,
+) -> bytes | None:
+    """Wait until a full-res img[alt='Generated image'] is available.
 
     Full-res base64 images are 200K-300K chars. We wait for one that's
-    at least 150K to avoid grabbing a blurry placeholder.
+    at least 150K to avoid grabbing a blurry placeholder. The wait runs
+    in-page on a MutationObserver, so it resolves as soon as the src swaps.
+    If compress_format is set, the image is re-encoded in-page first.
     """
     deadline = time.time() + (timeout_ms / 1000)
 
-    while time.time() < deadline:
-        imgs = await page.query_selector_all('img[alt="Generated image"]')
-        for img in imgs:
-            src = await img.get_attribute("src") or ""
-            if src.startswith("data:image/") and len(src) > 150_000:
-                _, encoded = src.split(",", 1)
-                return base64.b64decode(encoded)
-
-        await asyncio.sleep(SCREENSHOT_POLL_INTERVAL_S)
+    while (remaining_ms := int((deadline - time.time()) * 1000)) > 0:
+        try:
+            encoded = await page.evaluate(
+                _WAIT_FULL_RES_PAYLOAD_JS,
+                [
+                    GrokPage.GENERATED_IMAGE,
+                    FULL_RES_MIN_SRC_LEN,
+                    remaining_ms,
+                    compress_format,
+                    compress_quality,
+                ],
+            )
+        except PlaywrightError as e:
+            # Only a navigation is waited out and re-armed; any other in-page
+            # failure is the real error, so it goes to the caller as is
+            if not any(msg in str(e) for msg in _NAVIGATION_ERRORS):
+                raise
+            await page.wait_for_load_state("domcontentloaded")
+            continue
+        return base64.b64decode(encoded) if encoded else None
 
     return None
@@ -1,84 +1,121 @@
 """Quick script to open Grok and Sora, take screenshots, and probe DOM selectors."""
 
 import asyncio
-from playwright.async_api import async_playwright
-from pathlib import Path
+import os
+from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
+
+from config import USER_DATA_DIR, USER_DATA_PATH
+from page_objects import GrokPage
+from sora import MASTER_PROMPT_SEL
+
+# Seconds to keep the browser open at the end, e.g. to log in (0 = exit immediately)
+HOLD = int(os.getenv("SMI_DEBUG_HOLD", "60"))
+
+
+# (label, css selector, optional text filter). Playwright's :has-text() isn't
+# valid CSS, so text matches are applied in-page instead.
+PROBE_SELECTORS = [
+    ("textarea", "textarea", None),
+    ("input[type=text]", 'input[type="text"]', None),
+    ("contenteditable", '[contenteditable="true"]', None),
+    ("role=textbox", '[role="textbox"]', None),
+    ("button:Create", "button", "Create"),
+    ("button:Generate", "button", "Generate"),
+    ("button:Submit", 'button[type="submit"]', None),
+    ("button:Go", "button", "Go"),
+    ("button:Download", "button", "Download"),
+    ("button:More", 'button[aria-label="More"]', None),
+    ("button:MoreOptions", 'button[aria-label="More options"]', None),
+    ("video", "video", None),
+    ("video source", "video source", None),
+    ("img (large)", "img", None),
+]
+
+# Runs every probe in a single round-trip and returns counts plus details
+# for the first three matches of each selector
+PROBE_JS = """(probes) => probes.map(([label, sel, text]) => {
+    try {
+        let els = Array.from(document.querySelectorAll(sel));
+        if (text) {
+            const needle = text.toLowerCase();
+            els = els.filter(e => (e.innerText || e.textContent || '').toLowerCase().includes(needle));
+        }
+        return {
+            label,
+            count: els.length,
+            details: els.slice(0, 3).map(e => ({
+                tag: e.tagName,
+                text: (e.innerText || e.placeholder || e.value || '').slice(0, 80),
+                cls: e.className ? e.className.toString().slice(0, 60) : '',
+                aria: e.getAttribute('aria-label') || '',
+            })),
+        };
+    } catch (err) {
+        return { label, error: String(err) };
+    }
+})"""
 
 
 async def probe_selectors(page, name):
     """Try common selectors and report what's found."""
-    selectors = [
-        ("textarea", "textarea"),
-        ("input[type=text]", 'input[type="text"]'),
-        ("contenteditable", '[contenteditable="true"]'),
-        ("role=textbox", '[role="textbox"]'),
-        ("button:Create", 'button:has-text("Create")'),
-        ("button:Generate", 'button:has-text("Generate")'),
-        ("button:Submit", 'button[type="submit"]'),
-        ("button:Go", 'button:has-text("Go")'),
-        ("button:Download", 'button:has-text("Download")'),
-        ("button:More", 'button[aria-label="More"]'),
-        ("button:MoreOptions", 'button[aria-label="More options"]'),
-        ("video", "video"),
-        ("video source", "video source"),
-        ("img (large)", "img"),
-    ]
-
-    print(f"\n=== {name} SELECTOR PROBE ===")
-    for label, sel in selectors:
-        try:
-            els = await page.query_selector_all(sel)
-            if els:
-                count = len(els)
-                details = []
-                for el in els[:3]:
-                    tag = await el.evaluate("e => e.tagName")
-                    text = await el.evaluate("e => (e.innerText || e.placeholder || e.value || '').slice(0, 80)")
-                    cls = await el.evaluate("e => e.className ? e.className.toString().slice(0, 60) : ''")
-                    aria = await el.evaluate("e => e.getAttribute('aria-label') || ''")
-                    details.append(f"<{tag} class='{cls}' aria='{aria}' text='{text}'>")
-                print(f"  FOUND {label} ({count}x): {'; '.join(details)}")
-            else:
-                print(f"  miss  {label}")
-        except Exception as e:
-            print(f"  ERROR {label}: {e}")
+    results = await page.evaluate(PROBE_JS, PROBE_SELECTORS)
+
+    # Buffer the report so concurrent probes don't interleave their output
+    lines = [f"\n=== {name} SELECTOR PROBE ==="]
+    for r in results:
+        label = r["label"]
+        if "error" in r:
+            lines.append(f"  ERROR {label}: {r['error']}")
+        elif r["count"]:
+            details = [
+                f"<{d['tag']} class='{d['cls']}' aria='{d['aria']}' text='{d['text']}'>"
+                for d in r["details"]
+            ]
+            lines.append(f"  FOUND {label} ({r['count']}x): {'; '.join(details)}")
+        else:
+            lines.append(f"  miss  {label}")
+    print("\n".join(lines))
+
+
+async def open_and_probe(ctx, url, name, screenshot_path, ready_selector):
+    """Open url in a new tab, screenshot it, and probe selectors.
+
+    Waits for ready_selector so the SPA has rendered before anything is read;
+    if it never shows (e.g. a login redirect), the page is probed as is.
+    """
+    page = await ctx.new_page()
+    print(f"Opening {url}...")
+    await page.goto(url, wait_until="domcontentloaded")
+    try:
+        await page.wait_for_selector(ready_selector, timeout=15_000)
+    except PlaywrightTimeoutError:
+        print(f"{name}: '{ready_selector}' not found after 15s, probing anyway")
+    await page.screenshot(path=screenshot_path, full_page=False)
+    print(f"{name} final URL: {page.url}\n{name} title: {await page.title()}")
+    await probe_selectors(page, name)
 
 
 async def inspect():
     pw = await async_playwright().start()
-    user_data = Path.home() / ".smi-browser"
-    user_data.mkdir(parents=True, exist_ok=True)
+    USER_DATA_PATH.mkdir(parents=True, exist_ok=True)
 
     ctx = await pw.chromium.launch_persistent_context(
-        user_data_dir=str(user_data),
+        user_data_dir=USER_DATA_DIR,
         headless=False,
         viewport={"width": 1280, "height": 900},
         args=["--disable-blink-features=AutomationControlled"],
     )
 
-    # ── Grok Imagine ──
-    page1 = await ctx.new_page()
-    print("Opening grok.com/imagine...")
-    await page1.goto("https://grok.com/imagine", wait_until="domcontentloaded")
-    await asyncio.sleep(8)
-    await page1.screenshot(path="screenshot_grok.png", full_page=False)
-    print(f"Grok final URL: {page1.url}")
-    print(f"Grok title: {await page1.title()}")
-    await probe_selectors(page1, "GROK")
-
-    # ── Sora Storyboard ──
-    page2 = await ctx.new_page()
-    print("\nOpening sora.chatgpt.com/storyboard...")
-    await page2.goto("https://sora.chatgpt.com/storyboard", wait_until="domcontentloaded")
-    await asyncio.sleep(8)
-    await page2.screenshot(path="screenshot_sora.png", full_page=False)
-    print(f"Sora final URL: {page2.url}")
-    print(f"Sora title: {await page2.title()}")
-    await probe_selectors(page2, "SORA")
-
-    print("\n\nBrowser stays open for 60 seconds — log in if needed, then run again.")
-    print("Screenshots saved: screenshot_grok.png, screenshot_sora.png")
-    await asyncio.sleep(60)
+    # Grok and Sora are probed concurrently in separate tabs
+    await asyncio.gather(
+        open_and_probe(ctx, "https://grok.com/imagine", "GROK", "screenshot_grok.png", GrokPage.EDITOR),
+        open_and_probe(ctx, "https://sora.chatgpt.com/storyboard", "SORA", "screenshot_sora.png", MASTER_PROMPT_SEL),
+    )
+
+    print("\nScreenshots saved: screenshot_grok.png, screenshot_sora.png")
+    if HOLD:
+        print(f"\nBrowser stays open for {HOLD} seconds — log in if needed, then run again.")
+        await asyncio.sleep(HOLD)
 
     await ctx.close()
     await pw.stop()
@@ -0,0 +1,94 @@
+"""One launched persistent-profile context shared by the Sora test scripts.
+
+Launching the persistent profile is the slow part of every script, and the
+profile can only be open in one Chromium at a time anyway. Scripts ask for
+the shared context and open their own page in it instead of relaunching,
+so scripts run together in one process pay for the launch once.
+"""
+
+import asyncio
+from pathlib import Path
+from playwright.async_api import (
+    async_playwright, BrowserContext, Page, Playwright, TimeoutError as PlaywrightTimeoutError,
+)
+
+from browser import block_heavy_resources, download_file
+from config import USER_DATA_DIR, USER_DATA_PATH, HEADLESS, VIEWPORT_WIDTH, VIEWPORT_HEIGHT
+
+_pw: Playwright | None = None
+_ctx: BrowserContext | None = None
+_lock = asyncio.Lock()
+
+
+async def get_shared_context() -> BrowserContext:
+    """Return the shared context, launching it on first use."""
+    global _pw, _ctx
+    async with _lock:
+        if _ctx is None:
+            USER_DATA_PATH.mkdir(parents=True, exist_ok=True)
+            _pw = await async_playwright().start()
+            _ctx = await _pw.chromium.launch_persistent_context(
+                user_data_dir=USER_DATA_DIR,
+                headless=HEADLESS,
+                viewport={"width": VIEWPORT_WIDTH, "height": VIEWPORT_HEIGHT},
+                accept_downloads=True,
+                args=["--disable-blink-features=AutomationControlled"],
+            )
+        return _ctx
+
+
+async def open_page(
+    ctx: BrowserContext,
+    url: str,
+    ready_selector: str | None = None,
+    block_resources: bool = True,
+    keep_media: bool = False,
+) -> Page:
+    """Open url in a new page of ctx, then wait up to 10s for ready_selector.
+
+    A missing selector is not an error; the caller reports what it finds.
+    Images, fonts, media and analytics are blocked the same way as the
+    server's pages (see browser.block_heavy_resources), since the scripts
+    only read the DOM; pass keep_media=True where the video itself has to load.
+    """
+    page = await ctx.new_page()
+    if block_resources:
+        await block_heavy_resources(page, keep_media)
+    await page.goto(url, wait_until="domcontentloaded")
+    if ready_selector:
+        try:
+            await page.wait_for_selector(ready_selector, timeout=10_000)
+        except Exception:
+            pass
+    return page
+
+
+async def download_video_src(page: Page, out: Path) -> Path | None:
+    """Stream the detail page's <video> src straight to out.
+
+    Waits up to 10s for an http src and returns out once saved, or None if
+    the page exposes none, so the caller can fall back to the menu download.
+    """
+    try:
+        await page.wait_for_selector('video[src^="http"]', timeout=10_000)
+    except PlaywrightTimeoutError:
+        pass
+    src = await page.evaluate(
+        "() => { const v = document.querySelector('video'); return v ? (v.currentSrc || v.src) : ''; }"
+    )
+    if not src.startswith("http"):
+        return None
+    await download_file(page, src, str(out))  # Streamed to disk, not held in memory
+    return out
+
+
+async def close_shared_context() -> None:
+    """Close the shared context and stop Playwright, if launched."""
+    global _pw, _ctx
+    async with _lock:
+        if _ctx is not None:
+            await _ctx.close()
+            _ctx = None
+        if _pw is not None:
+            await _pw.stop()
+            _pw = None
@@ -0,0 +1,177 @@
+"""Page objects — each site's selectors and locators, defined once.
+
+Locators are lazy and re-resolve on use, so building them up front is free
+and keeps selector strings out of the workflow code.
+"""
+
+import re
+
+from playwright.async_api import Page, TimeoutError as PlaywrightTimeoutError
+
+
+# Hands the whole prompt to the editor as one synthetic paste, which
+# ProseMirror handles like a real clipboard paste
+_PASTE_TEXT_JS = """(el, text) => {
+    el.focus();
+    const data = new DataTransfer();
+    data.setData('text/plain', text);
+    el.dispatchEvent(new ClipboardEvent('paste', {
+        clipboardData: data,
+        bubbles: true,
+        cancelable: true,
+    }));
+    return el.textContent || '';
+}"""
+
+
+# Every short visible text node on the page with its parent's position
+VISIBLE_TEXT_JS = """(maxLen) => {
+    const items = [];
+    const rects = new Map();  // Text nodes often share a parent; measure each once
+    const walk = document.createTreeWalker(document.body, NodeFilter.SHOW_TEXT);
+    let node;
+    while (node = walk.nextNode()) {
+        const t = node.textContent.trim();
+        if (t.length > 1 && t.length < maxLen) {
+            const parent = node.parentElement;
+            let rect = rects.get(parent);
+            if (!rect) rects.set(parent, rect = parent.getBoundingClientRect());
+            if (rect.width > 0 && rect.height > 0) {
+                items.push({
+                    text: t,
+                    x: Math.round(rect.x),
+                    y: Math.round(rect.y),
+                    tag: parent.tagName,
+                    role: parent.getAttribute('role') || '',
+                });
+            }
+        }
+    }
+    return items;
+}"""
+
+
+async def get_visible_text(page: Page, max_len: int = 80) -> list[dict]:
+    """Return the page's visible text nodes shorter than max_len, read in one evaluate."""
+    return await page.evaluate(VISIBLE_TEXT_JS, max_len)
+
+
+# Text and box of every open menu item, read in one pass
+MENU_ITEMS_JS = """() => Array.from(document.querySelectorAll('[role="menuitem"]')).map(e => {
+    const r = e.getBoundingClientRect();
+    return { text: (e.innerText || '').trim(), x: r.x, y: r.y, w: r.width, h: r.height };
+})"""
+
+
+async def get_menu_items(page: Page) -> list[dict]:
+    """Return {text, x, y, w, h} for each [role=menuitem] on the page, in one read."""
+    return await page.evaluate(MENU_ITEMS_JS)
+
+
+def _squash(text: str) -> str:
+    return " ".join(text.split())
+
+
+class GrokPage:
+    """grok.com/imagine: prompt editor, submit button, result images."""
+
+    EDITOR = '[contenteditable="true"]'
+    SUBMIT = 'button[aria-label="Submit"]'
+    GENERATED_IMAGE = 'img[alt="Generated image"]'
+
+    def __init__(self, page: Page):
+        self.page = page
+        self.editor = page.locator(self.EDITOR).first
+        self.submit = page.locator(self.SUBMIT).first
+        self.images = page.locator(self.GENERATED_IMAGE)
+
+    async def enter_prompt(self, prompt: str) -> None:
+        """Replace the editor contents with prompt.
+
+        Pastes the whole prompt in one event instead of typing it key by
+        key. If the editor ignores the paste, falls back to a single
+        insertText, which is still one round-trip.
+        """
+        await self.editor.click()
+        await self.editor.press("Control+a")
+        await self.editor.press("Backspace")
+
+        text = await self.editor.evaluate(_PASTE_TEXT_JS, prompt)
+        if _squash(text) != _squash(prompt):
+            await self.editor.press("Control+a")
+            await self.editor.press("Backspace")
+            await self.page.keyboard.insert_text(prompt)
+
+
+class FbContentLibraryPage:
+    """Facebook Professional Dashboard content library table."""
+
+    TABLE = '[aria-label="Content Library"]'
+
+    def __init__(self, page: Page):
+        self.page = page
+        self.table = page.locator(self.TABLE).first
+
+
+class SoraDetailPage:
+    """sora.chatgpt.com/d/<id>: the draft's toolbar and three-dot menu."""
+
+    TOOLBAR_BUTTON = "button:has(svg)"
+    # Matched by the first circle's SVG path
+    THREE_DOT = 'button:has(svg path[d^="M3 12a2"])'
+    MENU_ITEM = '[role="menuitem"]'
+
+    def __init__(self, page: Page):
+        self.page = page
+        self.three_dot = page.locator(self.THREE_DOT).first
+        self.menu_items = page.locator(self.MENU_ITEM)
+
+    async def open_menu(self) -> bool:
+        """Click the three-dot button and wait for its menu.
+
+        Returns False if the button isn't on the page.
+        """
+        if not await self.three_dot.count():
+            return False
+        await self.three_dot.click()
+        try:
+            await self.menu_items.first.wait_for(timeout=5_000)
+        except Exception:
+            pass
+        return True
+
+    async def click_menuitem(self, text: str, exact: bool = True) -> bool:
+        """Click the first visible menu item matching text.
+
+        The position is resolved at click time, so a menu still animating in
+        can't make it stale. If an overlay keeps intercepting the click, it is
+        retried with force=True. Returns False if nothing matched.
+        """
+        item = self.menuitem(text, exact)
+        if not await item.count():
+            return False
+        try:
+            await item.click(timeout=2_000)
+        except PlaywrightTimeoutError:
+            await item.click(force=True)
+        return True
+
+    async def wait_for_menuitem(self, text: str, exact: bool = True, timeout: float = 5_000) -> bool:
+        """Wait until a menu item matching text is visible, e.g. a submenu's.
+
+        Returns as soon as it renders; False if it didn't within timeout.
+        """
+        try:
+            await self.menuitem(text, exact).wait_for(timeout=timeout)
+        except PlaywrightTimeoutError:
+            return False
+        return True
+
+    def menuitem(self, text: str, exact: bool = True):
+        """Locator for the first visible menu item whose text is (or contains) text.
+
+        The text match runs inside the page's selector engine, so finding the
+        item is part of the action's one round-trip rather than a read per item.
+        """
+        pattern = re.compile(rf"^\s*{re.escape(text)}\s*$") if exact else text
+        return self.page.locator(f"{self.MENU_ITEM}:visible").filter(has_text=pattern).first
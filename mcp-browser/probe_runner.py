@@ -0,0 +1,76 @@
+"""Run the Sora detail-page probes concurrently in one browser.
+
+A persistent profile can only be opened by one Chromium at a time, so the
+probe scripts can't run side by side as separate processes. This launches
+the profile once and runs every probe in its own tab of that context.
+Each probe's output is buffered and printed in order once all are done.
+
+Usage: python probe_runner.py
+"""
+
+import asyncio
+import contextvars
+import io
+import sys
+
+from launched_browser import get_shared_context, close_shared_context
+import test_sora_detail_probe
+import test_sora_detail_probe2
+import test_sora_detail_probe3
+import test_sora_detail_probe4
+import test_sora_detail_probe5
+
+PROBES = [
+    test_sora_detail_probe,
+    test_sora_detail_probe2,
+    test_sora_detail_probe3,
+    test_sora_detail_probe4,
+    test_sora_detail_probe5,
+]
+
+# Output buffer for the probe running in the current task
+_output: contextvars.ContextVar[io.StringIO | None] = contextvars.ContextVar("output", default=None)
+
+
+class _TaskStdout:
+    """Routes print() to the current task's buffer, or the real stdout."""
+
+    def __init__(self, real):
+        self.real = real
+
+    def write(self, text):
+        return (_output.get() or self.real).write(text)
+
+    def flush(self):
+        self.real.flush()
+
+
+async def run_probe(module, ctx) -> str:
+    buf = io.StringIO()
+    _output.set(buf)  # Tasks run in a copy of the context, so this stays local
+    try:
+        await module.probe(ctx)
+    except Exception as e:
+        print(f"\nPROBE FAILED: {e}")
+    return buf.getvalue()
+
+
+async def main():
+    ctx = await get_shared_context()
+
+    real_stdout = sys.stdout
+    sys.stdout = _TaskStdout(real_stdout)
+    try:
+        outputs = await asyncio.gather(*(run_probe(m, ctx) for m in PROBES))
+    finally:
+        sys.stdout = real_stdout
+
+    for module, output in zip(PROBES, outputs):
+        print(f"\n########## {module.__name__} ##########")
+        print(output)
+
+    await close_shared_context()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -5,7 +5,11 @@ The agent just calls generate_image(prompt) or generate_video(prompt)
 and gets back a local file path.
 """
 
+import asyncio
 import os
+import shutil
+import time
+from contextlib import asynccontextmanager
 from pathlib import Path
 
 from mcp.server.fastmcp import FastMCP
@@ -13,10 +17,54 @@ from mcp.server.fastmcp import FastMCP
 from grok import generate_grok_image
 from sora import generate_sora_video
 from facebook_metrics import scrape_facebook_content_library
-from browser import check_auth, shutdown
+import cache
+from browser import check_auth_many, shutdown, start_warmup
 from config import GROK_URL, SORA_STORYBOARD_URL
 
-mcp = FastMCP("smi-browser", json_response=True)
+
+@asynccontextmanager
+async def lifespan(server: FastMCP):
+    """Launch the browser while the client is still connecting; close it on exit."""
+    start_warmup((GROK_URL, SORA_STORYBOARD_URL))
+    try:
+        yield
+    finally:
+        await shutdown()
+
+
+mcp = FastMCP("smi-browser", json_response=True, lifespan=lifespan)
+
+# check_browser_session results, reused for AUTH_CACHE_TTL_S
+AUTH_CACHE_TTL_S = 60
+_auth_cache: dict[str, tuple[float, dict]] = {}
+
+
+def _check_output_path(output_path: Path) -> dict | None:
+    """Create output_path's directory up front so a bad path fails before generating.
+
+    Returns a failed tool result if the directory can't be created or written.
+    """
+    directory = output_path.parent
+    try:
+        directory.mkdir(parents=True, exist_ok=True)
+    except OSError as e:
+        error = f"Cannot create output directory {directory}: {e}"
+    else:
+        if not os.access(directory, os.W_OK):
+            error = f"Output directory not writable: {directory}"
+        elif output_path.is_dir():
+            error = f"Output path is a directory: {output_path}"
+        else:
+            return None
+    return {"success": False, "path": "", "generation_time_ms": 0, "error": error}
+
+
+def _serve_cached(cached: str, dest: Path) -> dict:
+    """Copy a cached generation to dest and build the tool result for it."""
+    if dest.resolve() != Path(cached).resolve():
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(cached, dest)
+    return {"success": True, "path": str(dest), "generation_time_ms": 0, "cached": True}
 
 
 @mcp.tool()
@@ -25,6 +73,7 @@ async def generate_image(
     output_dir: str,
     filename: str = "image.png",
     aspect_ratio: str = "1:1",
+    compress: bool = False,
 ) -> dict:
     """Generate an image via Grok Imagine.
 
@@ -36,16 +85,33 @@ async def generate_image(
         output_dir: Directory to save the generated image.
         filename: Output filename (default: image.png).
         aspect_ratio: Aspect ratio — "1:1", "16:9", "9:16" (default: 1:1).
+        compress: Re-encode as a smaller lossy image (WebP by default); the
+            returned path's suffix is changed to match (default: false).
+
+    Identical requests within 24h reuse the earlier image (cached: true).
 
     Returns:
-        { success: bool, path: str, generation_time_ms: int, error?: str }
+        { success: bool, path: str, generation_time_ms: int, cached?: bool, error?: str }
     """
-    output_path = str(Path(output_dir) / filename)
-    return await generate_grok_image(
+    output_path = Path(output_dir) / filename
+    if (invalid := await asyncio.to_thread(_check_output_path, output_path)) is not None:
+        return invalid
+    key = cache.make_key("grok", prompt, aspect_ratio, compress)
+    cached = await asyncio.to_thread(cache.lookup, key)
+    if cached is not None:
+        # A compressed result carries the re-encoded format's suffix
+        dest = output_path.with_suffix(Path(cached).suffix) if compress else output_path
+        return await asyncio.to_thread(_serve_cached, cached, dest)
+
+    result = await generate_grok_image(
         prompt=prompt,
-        output_path=output_path,
+        output_path=str(output_path),
         aspect_ratio=aspect_ratio,
+        compress=compress,
     )
+    if result["success"]:
+        await asyncio.to_thread(cache.store, key, result["path"])
+    return result
 
 
 @mcp.tool()
@@ -70,16 +136,28 @@ async def generate_video(
         duration: Video duration in seconds (default: 10).
         aspect_ratio: Aspect ratio — "9:16", "16:9", "1:1" (default: 9:16).
 
+    Identical requests within 24h reuse the earlier video (cached: true).
+
     Returns:
-        { success: bool, path: str, generation_time_ms: int, error?: str }
+        { success: bool, path: str, generation_time_ms: int, cached?: bool, error?: str }
     """
-    output_path = str(Path(output_dir) / filename)
-    return await generate_sora_video(
+    output_path = Path(output_dir) / filename
+    if (invalid := await asyncio.to_thread(_check_output_path, output_path)) is not None:
+        return invalid
+    key = cache.make_key("sora", prompt, duration, aspect_ratio)
+    cached = await asyncio.to_thread(cache.lookup, key)
+    if cached is not None:
+        return await asyncio.to_thread(_serve_cached, cached, output_path)
+
+    result = await generate_sora_video(
         prompt=prompt,
-        output_path=output_path,
+        output_path=str(output_path),
         duration=duration,
         aspect_ratio=aspect_ratio,
     )
+    if result["success"]:
+        await asyncio.to_thread(cache.store, key, result["path"])
+    return result
 
 
 @mcp.tool()
@@ -118,22 +196,29 @@ async def check_browser_session() -> dict:
         { grok: { authenticated: bool, message: str },
           sora: { authenticated: bool, message: str } }
     """
-    # Grok: authenticated users see the imagine prompt area
-    grok_status = await check_auth(
-        GROK_URL,
-        'textarea, input[type="text"], [contenteditable="true"], [role="textbox"]',
-    )
-
-    # Sora: authenticated users see the storyboard prompt area
-    sora_status = await check_auth(
-        SORA_STORYBOARD_URL,
-        'textarea, button:has-text("Create"), input[type="text"]',
-    )
-
-    return {
-        "grok": grok_status,
-        "sora": sora_status,
-    }
+    now = time.monotonic()
+    checked_at, cached = _auth_cache.get("result", (0.0, None))
+    if cached is not None and now - checked_at < AUTH_CACHE_TTL_S:
+        return cached
+
+    result = await check_auth_many({
+        # Grok: authenticated users see the imagine prompt area
+        "grok": (
+            GROK_URL,
+            'textarea, input[type="text"], [contenteditable="true"], [role="textbox"]',
+        ),
+        # Sora: authenticated users see the storyboard prompt area
+        "sora": (
+            SORA_STORYBOARD_URL,
+            'textarea, button:has-text("Create"), input[type="text"]',
+        ),
+    })
+    # Only cache a fully signed-in answer, so a re-check after logging in is live
+    if all(status["authenticated"] for status in result.values()):
+        _auth_cache["result"] = (now, result)
+    else:
+        _auth_cache.pop("result", None)
+    return result
 
 
 def main():
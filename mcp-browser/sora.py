@@ -16,9 +16,10 @@ Full workflow:
 
 import asyncio
 import time
-from pathlib import Path
 
-from browser import get_page, wait_for_element, close_page
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+from browser import get_page, wait_for_element, wait_for_condition, close_page, download_file
 from config import (
     SORA_STORYBOARD_URL,
     SORA_DRAFTS_URL,
@@ -26,7 +27,30 @@ from config import (
     SORA_RETRY_DELAY_S,
     SORA_DRAFT_POLL_INTERVAL_S,
     SORA_TIMEOUT_MS,
+    DEFAULT_TIMEOUT_MS,
+)
+
+MASTER_PROMPT_SEL = 'textarea[placeholder*="Describe your video"]'
+DRAFT_LINK_SEL = 'a[href^="/d/"]'
+# Each is one query: the alternatives are matched in a single round-trip
+DURATION_BUTTON_SEL = ", ".join(
+    f'button:has-text("{label}")' for label in ("5s", "10s", "15s", "20s", "25s")
 )
+CREATE_BUTTON_SEL = 'button:has-text("Create"), button[aria-label="Create"]'
+# Scene cards show up as scene-classed/test-id elements or a "Scene 1" label;
+# one selector, so a single in-page wait covers every form
+SCENE_CARDS_SEL = ':text("Scene 1"), [class*="scene"], [data-testid*="scene"]'
+# Longest wait for the drafts snapshot once the scene cards are in
+DRAFTS_SNAPSHOT_TIMEOUT_S = 60
+# How often the in-page new-draft check re-runs. A fixed interval rather than
+# "raf", which Chromium pauses while the tab is in the background
+DRAFT_CHECK_INTERVAL_MS = 1_000
+
+# Storyboard is usable once the master prompt renders; a login redirect
+# also ends the wait so it's reported without sitting out the timeout
+_STORYBOARD_READY_JS = """(sel) =>
+    location.href.includes('login') || !!document.querySelector(sel)
+"""
 
 
 async def generate_sora_video(
@@ -44,12 +68,17 @@ async def generate_sora_video(
 
     for attempt in range(1, RETRY_ATTEMPTS + 1):
         page = None
+        drafts_task = None
+        create_clicked = False
         try:
             start_time = time.time()
 
             # ── Step 1: Open storyboard page ──
-            page = await get_page(SORA_STORYBOARD_URL)
-            await asyncio.sleep(5)
+            # Keep media so the drafts/detail views still load their videos
+            page = await get_page(SORA_STORYBOARD_URL, block_resources=True, keep_media=True)
+            await wait_for_condition(
+                page, _STORYBOARD_READY_JS, timeout_ms=15_000, arg=MASTER_PROMPT_SEL
+            )
 
             if "login" in page.url:
                 last_error = (
@@ -62,12 +91,16 @@ async def generate_sora_video(
                     continue
                 break
 
+            # Snapshot existing drafts in parallel so we can detect the new one;
+            # taken before submitting, it's the true "before" state
+            drafts_task = asyncio.create_task(_snapshot_existing_drafts())
+            drafts_task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
             # ── Step 2: Set duration to 25s ──
             await _set_duration(page, duration)
 
             # ── Step 3: Type master prompt ──
-            master_sel = 'textarea[placeholder*="Describe your video"]'
-            found = await wait_for_element(page, master_sel, timeout_ms=15_000)
+            found = await wait_for_element(page, MASTER_PROMPT_SEL, timeout_ms=15_000)
             if not found:
                 last_error = "Could not find master prompt textarea ('Describe your video...')"
                 if attempt < RETRY_ATTEMPTS:
@@ -76,32 +109,28 @@ async def generate_sora_video(
                     continue
                 break
 
-            textarea = await page.query_selector(master_sel)
+            textarea = await page.query_selector(MASTER_PROMPT_SEL)
             await textarea.click()
             await textarea.fill(prompt)
-            await asyncio.sleep(1)
 
             # ── Step 4: Submit the master prompt by pressing Enter ──
             await page.keyboard.press("Enter")
-            await asyncio.sleep(3)
 
             # ── Step 6: Wait for storyboard to generate scene cards (5+ min) ──
             # After submitting the master prompt, Sora generates a storyboard
             # with scene cards. This can take 5+ minutes.
             scene_cards_found = await _wait_for_scene_cards(page, timeout_s=600)
 
-            # ── Step 6: Snapshot existing drafts so we can detect the new one ──
-            # Open drafts in background to get existing list
-            drafts_page = await get_page(SORA_DRAFTS_URL)
-            await asyncio.sleep(3)
-            existing_drafts = set(await _get_draft_hrefs(drafts_page))
-            await close_page(drafts_page)
+            # ── Step 6: Collect the drafts snapshot started in step 1 ──
+            # It has had minutes to finish; if it still hasn't (or failed), go
+            # on with an empty set and take it on the drafts page instead
+            try:
+                existing_drafts = await asyncio.wait_for(drafts_task, DRAFTS_SNAPSHOT_TIMEOUT_S)
+            except Exception:
+                existing_drafts = set()
 
             # ── Step 7: Click Create (ONCE ONLY) ──
-            create_clicked = False
-            create_btn = await page.query_selector('button:has-text("Create")')
-            if not create_btn:
-                create_btn = await page.query_selector('button[aria-label="Create"]')
+            create_btn = await page.query_selector(CREATE_BUTTON_SEL)
             if not create_btn:
                 last_error = "Could not find Create button"
                 if attempt < RETRY_ATTEMPTS:
@@ -110,16 +139,31 @@ async def generate_sora_video(
                     continue
                 break
 
-            if not create_clicked:
-                await create_btn.click()
-                create_clicked = True
-                await asyncio.sleep(5)
+            # Let the create request reach Sora before navigating away. Only a
+            # missing response is let through; a click that timed out never
+            # reached Sora, so it fails this attempt like any other error
+            try:
+                async with page.expect_response(
+                    lambda r: r.request.method == "POST" and "sora.chatgpt.com" in r.url,
+                    timeout=15_000,
+                ):
+                    await create_btn.click()
+                    create_clicked = True
+            except PlaywrightTimeoutError:
+                if not create_clicked:
+                    raise
 
             # ── Step 8: Navigate to /drafts and poll for the new video ──
             # IMPORTANT: Never go back to storyboard after clicking Create.
             # If drafts polling fails, do NOT retry the whole flow — just fail.
-            await page.goto(SORA_DRAFTS_URL, wait_until="domcontentloaded")
-            await asyncio.sleep(3)
+            # Navigations from here on get the long timeout: the page default is
+            # short, and a timeout now can only end the flow, never retry it
+            await page.goto(SORA_DRAFTS_URL, wait_until="commit", timeout=DEFAULT_TIMEOUT_MS)
+            await wait_for_element(page, DRAFT_LINK_SEL, timeout_ms=15_000)
+            if not existing_drafts:
+                # No snapshot: the new video takes minutes to show up, so the
+                # tiles here right after Create are still the "before" state
+                existing_drafts = set(await _get_draft_hrefs(page))
 
             new_draft_href = await _poll_drafts_for_new(
                 page, existing_drafts, timeout_ms=SORA_TIMEOUT_MS
@@ -136,8 +180,8 @@ async def generate_sora_video(
                 await tile_link.click()
             else:
                 full_url = f"https://sora.chatgpt.com{new_draft_href}"
-                await page.goto(full_url, wait_until="domcontentloaded")
-            await asyncio.sleep(5)
+                await page.goto(full_url, wait_until="commit", timeout=DEFAULT_TIMEOUT_MS)
+            await wait_for_element(page, 'video[src^="http"]', timeout_ms=30_000)
 
             # ── Step 10: Grab video src URL and download directly ──
             # The <video> element's src is a direct URL to the no-watermark video
@@ -151,11 +195,8 @@ async def generate_sora_video(
                 last_error = f"Video src is not a URL: {video_src[:80]}"
                 break
 
-            out = Path(output_path)
-            out.parent.mkdir(parents=True, exist_ok=True)
-            response = await page.request.get(video_src)
-            content = await response.body()
-            out.write_bytes(content)
+            # Streamed straight to disk with the page's cookies, not via CDP
+            await download_file(page, video_src, output_path)
 
             elapsed_ms = int((time.time() - start_time) * 1000)
             await close_page(page)
@@ -170,8 +211,14 @@ async def generate_sora_video(
             last_error = str(e)
             if page:
                 await close_page(page)
+            if create_clicked:
+                # A retry would click Create again and start a second video
+                break
             if attempt < RETRY_ATTEMPTS:
                 await asyncio.sleep(SORA_RETRY_DELAY_S)
+        finally:
+            if drafts_task is not None:
+                drafts_task.cancel()
 
     return {
         "success": False,
@@ -189,24 +236,17 @@ async def _set_duration(page, duration: int) -> None:
     then selecting the exact option (e.g. '25 seconds')."""
     try:
         # Click whichever duration button is currently shown (e.g. "10s")
-        dur_btn = None
-        for label in ["10s", "5s", "15s", "20s", "25s"]:
-            dur_btn = await page.query_selector(f'button:has-text("{label}")')
-            if dur_btn:
-                break
-
+        dur_btn = await page.query_selector(DURATION_BUTTON_SEL)
         if not dur_btn:
             return
 
         await dur_btn.click()
-        await asyncio.sleep(1)
 
         # Click the exact text option in the popover (e.g. "25 seconds")
         option_text = f"{duration} seconds"
-        loc = page.get_by_text(option_text, exact=True)
-        if await loc.count() > 0:
-            await loc.first.click()
-            await asyncio.sleep(0.5)
+        loc = page.get_by_text(option_text, exact=True).first
+        await loc.wait_for(state="visible", timeout=5_000)
+        await loc.click()
     except Exception:
         pass
 
@@ -214,51 +254,89 @@ async def _set_duration(page, duration: int) -> None:
 async def _wait_for_scene_cards(page, timeout_s: int = 600) -> bool:
     """Wait for storyboard scene cards to auto-populate after submitting the master prompt.
     This can take 5+ minutes. Returns True if scene cards were detected, False on timeout."""
-    deadline = time.time() + timeout_s
-    while time.time() < deadline:
-        # Scene cards typically contain "Scene" text in headers/labels
-        scenes = await page.query_selector_all('[class*="scene"], [data-testid*="scene"]')
-        if len(scenes) >= 1:
-            return True
-        # Also check for text containing "Scene 1"
-        loc = page.get_by_text("Scene 1")
-        if await loc.count() > 0:
-            return True
-        await asyncio.sleep(5)
-    return False
+    try:
+        await page.locator(SCENE_CARDS_SEL).first.wait_for(state="attached", timeout=timeout_s * 1000)
+        return True
+    except PlaywrightTimeoutError:
+        return False
+
+
+async def _snapshot_existing_drafts() -> set[str]:
+    """Open /drafts in its own page and return the draft hrefs already there.
+
+    Only the tile links are read, so the grid's preview videos are blocked
+    along with images and fonts.
+    """
+    # The calling flow already holds a page slot for its storyboard page
+    drafts_page = await get_page(SORA_DRAFTS_URL, block_resources=True, take_slot=False)
+    try:
+        await wait_for_element(drafts_page, DRAFT_LINK_SEL, timeout_ms=15_000)
+        return set(await _get_draft_hrefs(drafts_page))
+    finally:
+        await close_page(drafts_page)
 
 
 async def _get_draft_hrefs(page) -> list[str]:
     """Get all draft tile href values from the /drafts page."""
-    links = await page.query_selector_all('a[href^="/d/"]')
-    hrefs = []
-    for link in links:
-        href = await link.get_attribute("href")
-        if href:
-            hrefs.append(href)
-    return hrefs
+    return await page.eval_on_selector_all(
+        DRAFT_LINK_SEL, "els => els.map(e => e.getAttribute('href')).filter(Boolean)"
+    )
+
+
+# Resolves with the first draft tile href not in the known set, or null
+_NEW_DRAFT_HREF_JS = """([sel, known]) => {
+    const seen = new Set(known);
+    for (const a of document.querySelectorAll(sel)) {
+        const href = a.getAttribute('href');
+        if (href && !seen.has(href)) return href;
+    }
+    return null;
+}"""
 
 
 async def _poll_drafts_for_new(
     page, existing_draft_set: set, timeout_ms: int
 ) -> str | None:
-    """Poll /drafts until a new tile appears that wasn't in existing_draft_set.
+    """Wait on /drafts until a new tile appears that wasn't in existing_draft_set.
+
+    The page refetches its drafts list in the background, so the tile list is
+    re-checked in-page every DRAFT_CHECK_INTERVAL_MS and drafts API responses
+    are tracked. Only when a
+    whole poll interval passes without the page fetching drafts itself is it
+    reloaded.
 
     Returns the href of the new draft, or None on timeout.
     """
     deadline = time.time() + (timeout_ms / 1000)
+    known = list(existing_draft_set)
+    drafts_fetched = asyncio.Event()
 
-    while time.time() < deadline:
-        current_hrefs = await _get_draft_hrefs(page)
-        new_hrefs = [h for h in current_hrefs if h not in existing_draft_set]
-
-        if new_hrefs:
-            return new_hrefs[0]
+    def _on_response(response) -> None:
+        if response.request.resource_type in ("xhr", "fetch") and "draft" in response.url.lower():
+            drafts_fetched.set()
 
-        # Refresh and wait
-        await page.reload(wait_until="domcontentloaded")
-        await asyncio.sleep(SORA_DRAFT_POLL_INTERVAL_S)
+    page.on("response", _on_response)
+    try:
+        while (remaining_s := deadline - time.time()) > 0:
+            drafts_fetched.clear()
+            try:
+                handle = await page.wait_for_function(
+                    _NEW_DRAFT_HREF_JS,
+                    arg=[DRAFT_LINK_SEL, known],
+                    polling=DRAFT_CHECK_INTERVAL_MS,
+                    timeout=min(SORA_DRAFT_POLL_INTERVAL_S, remaining_s) * 1000,
+                )
+                return await handle.json_value()
+            except PlaywrightTimeoutError:
+                pass
+
+            # The page didn't refresh drafts on its own this interval
+            if not drafts_fetched.is_set() and deadline > time.time():
+                try:
+                    await page.reload(wait_until="domcontentloaded", timeout=DEFAULT_TIMEOUT_MS)
+                except PlaywrightTimeoutError:
+                    pass  # Still on /drafts; the next interval waits again
+    finally:
+        page.remove_listener("response", _on_response)
 
     return None
-
-
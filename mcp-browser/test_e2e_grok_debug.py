@@ -1,8 +1,14 @@
 """Debug: step through the Grok generation with screenshots at each step."""
 
 import asyncio
+import os
 from pathlib import Path
-from playwright.async_api import async_playwright
+from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
+
+from page_objects import GrokPage
+
+# Seconds to keep the browser open at the end for inspection (0 = exit immediately)
+HOLD = int(os.getenv("SMI_DEBUG_HOLD", "0"))
 
 
 async def test():
@@ -17,8 +23,11 @@ async def test():
     )
 
     page = await ctx.new_page()
-    await page.goto("https://grok.com/imagine", wait_until="domcontentloaded")
-    await asyncio.sleep(5)
+    await page.goto("https://grok.com/imagine", wait_until="commit")
+    try:
+        await page.wait_for_selector('[contenteditable="true"]', timeout=15_000)
+    except Exception:
+        pass  # Fall through to the alternative-selector dump below
     print(f"Page URL: {page.url}")
 
     # Step 1: Find editor
@@ -26,11 +35,16 @@ async def test():
     print(f"Editor found: {editor is not None}")
     if not editor:
         print("Trying alternative selectors...")
-        for sel in ['textarea', '.ProseMirror', '.tiptap', '[role="textbox"]']:
-            el = await page.query_selector(sel)
-            print(f"  {sel}: {el is not None}")
+        # Check every fallback in one round-trip, still reporting each one
+        fallbacks = ['textarea', '.ProseMirror', '.tiptap', '[role="textbox"]']
+        present = await page.evaluate(
+            "sels => sels.map(s => document.querySelector(s) !== null)", fallbacks
+        )
+        for sel, found in zip(fallbacks, present):
+            print(f"  {sel}: {found}")
         await page.screenshot(path="debug_step1.png")
-        await asyncio.sleep(30)
+        if HOLD:
+            await asyncio.sleep(HOLD)
         await ctx.close()
         await pw.stop()
         return
@@ -40,15 +54,9 @@ async def test():
     print(f"Initial images: {len(initial)}")
 
     # Step 3: Click and type
-    await editor.click()
-    await asyncio.sleep(0.3)
-    await page.keyboard.press("Control+a")
-    await page.keyboard.press("Backspace")
-    await asyncio.sleep(0.3)
-
+    # Pasted in one event rather than typed key by key
     prompt = "a cute baby seal on a beach at sunset"
-    await page.keyboard.type(prompt, delay=20)
-    await asyncio.sleep(1)
+    await GrokPage(page).enter_prompt(prompt)
 
     # Verify text was entered
     text_content = await editor.evaluate("e => e.textContent")
@@ -66,33 +74,42 @@ async def test():
     else:
         print("No submit button! Taking screenshot...")
         await page.screenshot(path="debug_no_submit.png")
-        await asyncio.sleep(30)
+        if HOLD:
+            await asyncio.sleep(HOLD)
         await ctx.close()
         await pw.stop()
         return
 
-    # Step 5: Poll for results
-    await asyncio.sleep(2)
+    # Step 5: Wait for results
     await page.screenshot(path="debug_step3_after_submit.png")
 
-    for i in range(20):
-        await asyncio.sleep(3)
+    # Re-checked in-page every 250ms, so this resolves right after a tile mounts
+    try:
+        await page.wait_for_function(
+            "n => document.querySelectorAll('img[alt=\"Generated image\"]').length > n",
+            arg=len(initial),
+            polling=250,
+            timeout=60_000,
+        )
+        appeared = True
+    except PlaywrightTimeoutError:
+        appeared = False
+
+    if appeared:
         current = await page.query_selector_all('img[alt="Generated image"]')
-        print(f"  Poll {i+1}: {len(current)} images (initial: {len(initial)})")
-        if len(current) > len(initial):
-            print("SUCCESS: New images appeared!")
-            new_img = current[len(initial)]
-            src = await new_img.get_attribute("src") or ""
-            print(f"  src type: {'base64' if src.startswith('data:') else 'url' if src.startswith('http') else 'unknown'}")
-            print(f"  src length: {len(src)}")
-            await page.screenshot(path="debug_step4_result.png")
-            break
+        print(f"SUCCESS: New images appeared! {len(current)} images (initial: {len(initial)})")
+        new_img = current[len(initial)]
+        src = await new_img.get_attribute("src") or ""
+        print(f"  src type: {'base64' if src.startswith('data:') else 'url' if src.startswith('http') else 'unknown'}")
+        print(f"  src length: {len(src)}")
+        await page.screenshot(path="debug_step4_result.png")
     else:
-        print("No new images after polling.")
+        print("No new images after 60s.")
         await page.screenshot(path="debug_step4_timeout.png")
 
-    print("\nDone. Browser stays open 20 seconds...")
-    await asyncio.sleep(20)
+    if HOLD:
+        print(f"\nDone. Browser stays open {HOLD} seconds...")
+        await asyncio.sleep(HOLD)
     await ctx.close()
     await pw.stop()
 
@@ -1,8 +1,14 @@
 """Probe: after generation, inspect the results page tiles and the detail view."""
 
 import asyncio
+import os
 from pathlib import Path
-from playwright.async_api import async_playwright
+from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
+
+from page_objects import GrokPage
+
+# Seconds to keep the browser open at the end for inspection (0 = exit immediately)
+HOLD = int(os.getenv("SMI_DEBUG_HOLD", "0"))
 
 
 async def test():
@@ -17,41 +23,51 @@ async def test():
     )
 
     page = await ctx.new_page()
-    await page.goto("https://grok.com/imagine", wait_until="domcontentloaded")
-    await asyncio.sleep(5)
+    await page.goto("https://grok.com/imagine", wait_until="commit")
 
     # Submit a prompt
-    editor = await page.query_selector('[contenteditable="true"]')
-    await editor.click()
-    await page.keyboard.press("Control+a")
-    await page.keyboard.press("Backspace")
-    await page.keyboard.type("a tiny kitten playing with yarn, studio lighting", delay=20)
-    await asyncio.sleep(0.5)
+    await page.wait_for_selector(GrokPage.EDITOR, timeout=15_000)
+    await GrokPage(page).enter_prompt("a tiny kitten playing with yarn, studio lighting")
 
     submit = await page.query_selector('button[aria-label="Submit"]')
+    start_url = page.url
     await submit.click()
     print("Submitted. Waiting for generation page...")
 
     # Wait for the URL to change (redirect to results page)
-    await asyncio.sleep(3)
+    try:
+        await page.wait_for_url(lambda url: url != start_url, timeout=10_000)
+    except PlaywrightTimeoutError:
+        pass  # Reported just below
     print(f"URL after submit: {page.url}")
 
-    # Wait for images to load — poll until we see non-blurry images
-    # Let's just wait a fixed time and then inspect
-    print("Waiting 20s for images to fully load...")
-    await asyncio.sleep(20)
+    # Wait for the result grid (4 tiles) instead of a fixed delay
+    print("Waiting for generated images...")
+    try:
+        await page.wait_for_function(
+            "document.querySelectorAll('img[alt=\"Generated image\"]').length >= 4",
+            timeout=30_000,
+        )
+    except Exception:
+        print("Fewer than 4 generated images after 30s — inspecting anyway")
     await page.screenshot(path="debug_results_page.png")
 
     # Inspect ALL img elements on the results page
     imgs = await page.query_selector_all("img")
-    print(f"\nTotal img elements on results page: {len(imgs)}")
-    for i, img in enumerate(imgs):
-        src = await img.get_attribute("src") or ""
-        alt = await img.get_attribute("alt") or ""
-        cls = await img.evaluate("e => e.className")
-        box = await img.bounding_box()
-        w = box["width"] if box else 0
-        h = box["height"] if box else 0
+    # Read every img's attributes and size in a single round-trip
+    img_info = await page.eval_on_selector_all("img", """els => els.map(e => {
+        const r = e.getBoundingClientRect();
+        return {
+            src: e.getAttribute('src') || '',
+            alt: e.getAttribute('alt') || '',
+            cls: String(e.className || ''),
+            w: r.width,
+            h: r.height,
+        };
+    })""")
+    print(f"\nTotal img elements on results page: {len(img_info)}")
+    for i, info in enumerate(img_info):
+        src, alt, cls, w, h = info["src"], info["alt"], info["cls"], info["w"], info["h"]
         src_preview = src[:80] if not src.startswith("data:") else f"data:{src[5:20]}...({len(src)} chars)"
         print(f"  img[{i}]: {w:.0f}x{h:.0f} alt='{alt}' class='{cls[:50]}' src='{src_preview}'")
 
@@ -60,7 +76,7 @@ async def test():
     print("\n--- Looking for clickable tile wrappers ---")
 
     # Try finding the parent container of the result images
-    result_imgs = [img for img in imgs if (await img.bounding_box() or {}).get("width", 0) > 200]
+    result_imgs = [img for img, info in zip(imgs, img_info) if info["w"] > 200]
     print(f"Large images (>200px wide): {len(result_imgs)}")
 
     if result_imgs:
@@ -106,30 +122,37 @@ async def test():
             if box:
                 await page.mouse.click(box["x"] + box["width"]/2, box["y"] + box["height"]/2)
 
-        await asyncio.sleep(3)
+        # Continue as soon as the detail view's download controls render
+        try:
+            await page.wait_for_selector('button[aria-label="Download"], a[download]', timeout=5_000)
+        except PlaywrightTimeoutError:
+            pass  # The probe below reports what is there
         await page.screenshot(path="debug_detail_view.png")
         print(f"\nURL after clicking tile: {page.url}")
 
         # Probe for download/save/share buttons
         print("\n--- Detail view buttons ---")
-        buttons = await page.query_selector_all("button")
+        buttons = await page.eval_on_selector_all("button", """els => els.map(e => ({
+            text: (e.innerText || '').trim(),
+            aria: e.getAttribute('aria-label') || '',
+        }))""")
         for btn in buttons:
-            text = await btn.evaluate("e => (e.innerText || '').trim()")
-            aria = await btn.get_attribute("aria-label") or ""
-            if text or aria:
-                print(f"  button: text='{text[:40]}' aria='{aria}'")
+            if btn["text"] or btn["aria"]:
+                print(f"  button: text='{btn['text'][:40]}' aria='{btn['aria']}'")
 
         # Check for download links
-        links = await page.query_selector_all("a")
+        links = await page.eval_on_selector_all("a", """els => els.map(e => ({
+            text: (e.innerText || '').trim(),
+            href: e.getAttribute('href') || '',
+            download: e.getAttribute('download'),
+        }))""")
         for link in links:
-            text = await link.evaluate("e => (e.innerText || '').trim()")
-            href = await link.get_attribute("href") or ""
-            download_attr = await link.get_attribute("download")
-            if "download" in (text + href).lower() or download_attr is not None:
-                print(f"  download link: text='{text}' href='{href[:60]}' download={download_attr}")
-
-    print("\nBrowser stays open 30 seconds...")
-    await asyncio.sleep(30)
+            if "download" in (link["text"] + link["href"]).lower() or link["download"] is not None:
+                print(f"  download link: text='{link['text']}' href='{link['href'][:60]}' download={link['download']}")
+
+    if HOLD:
+        print(f"\nBrowser stays open {HOLD} seconds...")
+        await asyncio.sleep(HOLD)
     await ctx.close()
     await pw.stop()
 
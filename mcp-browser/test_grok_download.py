@@ -1,9 +1,15 @@
 """Test: focus on the download mechanism from Grok's detail view."""
 
 import asyncio
+import os
 from pathlib import Path
 from playwright.async_api import async_playwright
 
+from page_objects import GrokPage
+
+# Seconds to keep the browser open at the end for inspection (0 = exit immediately)
+HOLD = int(os.getenv("SMI_DEBUG_HOLD", "0"))
+
 
 async def test():
     pw = await async_playwright().start()
@@ -18,28 +24,30 @@ async def test():
     )
 
     page = await ctx.new_page()
-    await page.goto("https://grok.com/imagine", wait_until="domcontentloaded")
-    await asyncio.sleep(5)
+    await page.goto("https://grok.com/imagine", wait_until="commit")
 
     # Submit prompt
-    editor = await page.query_selector('[contenteditable="true"]')
-    await editor.click()
-    await page.keyboard.press("Control+a")
-    await page.keyboard.press("Backspace")
-    await page.keyboard.type("a majestic eagle soaring over mountains at dawn", delay=10)
-    await asyncio.sleep(0.5)
+    await page.wait_for_selector(GrokPage.EDITOR, timeout=15_000)
+    await GrokPage(page).enter_prompt("a majestic eagle soaring over mountains at dawn")
 
     submit = await page.query_selector('button[aria-label="Submit"]')
     await submit.click()
-    print("Submitted. Waiting 25s for full-res generation...")
-    await asyncio.sleep(25)
+    print("Submitted. Waiting for generated images...")
+    try:
+        await page.wait_for_function(
+            "document.querySelectorAll('img[alt=\"Generated image\"]').length >= 4",
+            timeout=30_000,
+        )
+    except Exception:
+        print("Fewer than 4 generated images after 30s — continuing anyway")
 
     # Check image sizes
     imgs = await page.query_selector_all('img[alt="Generated image"]')
     print(f"Found {len(imgs)} generated images")
-    for i, img in enumerate(imgs[:3]):
-        src = await img.get_attribute("src") or ""
-        print(f"  img[{i}] src length: {len(src)}")
+    # The handles are kept for the click below, so read their srcs concurrently
+    srcs = await asyncio.gather(*(img.get_attribute("src") for img in imgs[:3]))
+    for i, src in enumerate(srcs):
+        print(f"  img[{i}] src length: {len(src or '')}")
 
     # Click first tile
     if imgs:
@@ -47,12 +55,13 @@ async def test():
         if box:
             await page.mouse.click(box["x"] + box["width"]/2, box["y"] + box["height"]/2)
             print("Clicked first tile")
-            await asyncio.sleep(3)
 
+            # Find the download button once the detail view renders
+            try:
+                dl_btn = await page.wait_for_selector('button[aria-label="Download"]', timeout=5_000)
+            except Exception:
+                dl_btn = None
             print(f"Detail URL: {page.url}")
-
-            # Find the download button
-            dl_btn = await page.query_selector('button[aria-label="Download"]')
             print(f"Download button found: {dl_btn is not None}")
 
             if dl_btn:
@@ -67,16 +76,16 @@ async def test():
                 })""")
                 print(f"Download button info: {info}")
 
-                # Listen for downloads and network requests
-                downloads = []
-                page.on("download", lambda d: downloads.append(d))
-
                 print("Clicking download button...")
-                await dl_btn.click()
-                await asyncio.sleep(5)
-
-                if downloads:
-                    dl = downloads[0]
+                dl = None
+                try:
+                    async with page.expect_download(timeout=5_000) as dl_info:
+                        await dl_btn.click()
+                    dl = await dl_info.value
+                except Exception:
+                    pass
+
+                if dl:
                     print(f"Download triggered!")
                     print(f"  Suggested filename: {dl.suggested_filename}")
                     out_path = str(Path(__file__).parent / "test_output" / "eagle_download.png")
@@ -93,19 +102,19 @@ async def test():
                         print(f"  {p.url[:80]}")
 
                     # Maybe the image is now higher res on the detail page
-                    detail_imgs = await page.query_selector_all("img")
+                    detail_imgs = await page.locator("img").evaluate_all("""els => els.map(e => {
+                        const r = e.getBoundingClientRect();
+                        return { src: e.getAttribute('src') || '', alt: e.getAttribute('alt') || '', w: r.width, h: r.height };
+                    })""")
                     for img in detail_imgs:
-                        src = await img.get_attribute("src") or ""
-                        alt = await img.get_attribute("alt") or ""
-                        box = await img.bounding_box()
-                        w = box["width"] if box else 0
-                        h = box["height"] if box else 0
+                        src, alt, w, h = img["src"], img["alt"], img["w"], img["h"]
                         if w > 200:
                             src_info = f"base64 ({len(src)} chars)" if src.startswith("data:") else src[:80]
                             print(f"  Large img: {w:.0f}x{h:.0f} alt='{alt}' src={src_info}")
 
-    print("\nBrowser stays open 30 seconds...")
-    await asyncio.sleep(30)
+    if HOLD:
+        print(f"\nBrowser stays open {HOLD} seconds...")
+        await asyncio.sleep(HOLD)
     await ctx.close()
     await pw.stop()
 
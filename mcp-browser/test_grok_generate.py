@@ -1,9 +1,13 @@
 """Test: generate one image on Grok to see the post-generation DOM and download flow."""
 
 import asyncio
-from playwright.async_api import async_playwright
+import os
+from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
 from pathlib import Path
 
+# Seconds to keep the browser open at the end for inspection (0 = exit immediately)
+HOLD = int(os.getenv("SMI_DEBUG_HOLD", "0"))
+
 
 async def test():
     pw = await async_playwright().start()
@@ -17,8 +21,11 @@ async def test():
     )
 
     page = await ctx.new_page()
-    await page.goto("https://grok.com/imagine", wait_until="domcontentloaded")
-    await asyncio.sleep(5)
+    await page.goto("https://grok.com/imagine", wait_until="commit")
+    try:
+        await page.wait_for_selector('[contenteditable="true"]', timeout=15_000)
+    except Exception:
+        pass  # Reported just below
 
     # Type a simple prompt into the contenteditable
     editor = await page.query_selector('[contenteditable="true"]')
@@ -30,7 +37,6 @@ async def test():
     await editor.fill("")
     # Use keyboard.type instead of fill for contenteditable
     await page.keyboard.type("a golden sunset over calm ocean waves, photorealistic")
-    await asyncio.sleep(1)
 
     print("Typed prompt. Clicking submit...")
 
@@ -44,73 +50,89 @@ async def test():
 
     print("Submitted. Waiting for generation...")
 
-    # Poll for new images to appear
+    # Wait for new images to appear
     # Before: count existing images with alt="Generated image"
     initial_imgs = await page.query_selector_all('img[alt="Generated image"]')
     initial_count = len(initial_imgs)
     print(f"Initial generated images: {initial_count}")
 
-    for i in range(30):  # Poll for up to 90s
-        await asyncio.sleep(3)
+    # Re-checked in-page every 250ms until the first new image mounts (up to 90s)
+    try:
+        await page.wait_for_function(
+            "count => document.querySelectorAll('img[alt=\"Generated image\"]').length > count",
+            arg=initial_count,
+            polling=250,
+            timeout=90_000,
+        )
+        appeared = True
+    except PlaywrightTimeoutError:
+        appeared = False
+
+    if appeared:
         current_imgs = await page.query_selector_all('img[alt="Generated image"]')
-        current_count = len(current_imgs)
-        print(f"  Poll {i+1}: {current_count} images (was {initial_count})")
-
-        if current_count > initial_count:
-            print("New image(s) appeared!")
-
-            # Get the new image(s)
-            for img in current_imgs[initial_count:]:
-                src = await img.get_attribute("src")
-                box = await img.bounding_box()
-                w = box["width"] if box else 0
-                h = box["height"] if box else 0
-                print(f"  New image: {w}x{h} src={src[:100]}")
-
-            # Take screenshot of the result
-            await page.screenshot(path="screenshot_grok_result.png")
-
-            # Now click on the first new image to see if there's a detail/download view
-            new_img = current_imgs[initial_count]
-            print("\nClicking on the generated image...")
-            await new_img.click()
-            await asyncio.sleep(3)
-            await page.screenshot(path="screenshot_grok_detail.png")
-
-            # Probe for download buttons, share buttons, three-dot menus
-            probe_sels = [
-                ("button:Download", 'button:has-text("Download")'),
-                ("a:Download", 'a:has-text("Download")'),
-                ("button:Save", 'button:has-text("Save")'),
-                ("button:Share", 'button:has-text("Share")'),
-                ("button:More", 'button[aria-label="More"]'),
-                ("button:MoreOptions", 'button[aria-label="More options"]'),
-                ("button:3dots", 'button:has-text("...")'),
-                ("a[download]", "a[download]"),
-                ("svg-download", 'button svg'),
-            ]
-
-            print("\n=== POST-CLICK SELECTOR PROBE ===")
-            all_buttons = await page.query_selector_all("button")
-            print(f"Total buttons after click: {len(all_buttons)}")
-            for btn in all_buttons:
-                text = await btn.evaluate("e => (e.innerText || '').trim()")
-                aria = await btn.get_attribute("aria-label") or ""
-                if text or aria:
-                    print(f"  button: text='{text[:50]}' aria='{aria}'")
-
-            for label, sel in probe_sels:
-                el = await page.query_selector(sel)
-                if el:
-                    print(f"  FOUND: {label}")
-
-            break
+        print("New image(s) appeared!")
+
+        # Get the new image(s), with sizes read in one round-trip
+        img_info = await page.locator('img[alt="Generated image"]').evaluate_all("""els => els.map(e => {
+            const r = e.getBoundingClientRect();
+            return { src: e.getAttribute('src') || '', w: r.width, h: r.height };
+        })""")
+        for img in img_info[initial_count:]:
+            print(f"  New image: {img['w']}x{img['h']} src={img['src'][:100]}")
+
+        # Take screenshot of the result
+        await page.screenshot(path="screenshot_grok_result.png")
+
+        # Now click on the first new image to see if there's a detail/download view
+        new_img = current_imgs[initial_count]
+        print("\nClicking on the generated image...")
+        await new_img.click()
+        # Continue as soon as the detail view's download controls render
+        try:
+            await page.wait_for_selector('button[aria-label="Download"], a[download]', timeout=5_000)
+        except Exception:
+            pass  # The probe below reports what is there
+        await page.screenshot(path="screenshot_grok_detail.png")
+
+        # Probe for download buttons, share buttons, three-dot menus
+        # as (label, css, text the element must contain or None)
+        probe_sels = [
+            ("button:Download", "button", "Download"),
+            ("a:Download", "a", "Download"),
+            ("button:Save", "button", "Save"),
+            ("button:Share", "button", "Share"),
+            ("button:More", 'button[aria-label="More"]', None),
+            ("button:MoreOptions", 'button[aria-label="More options"]', None),
+            ("button:3dots", "button", "..."),
+            ("a[download]", "a[download]", None),
+            ("svg-download", "button svg", None),
+        ]
+
+        print("\n=== POST-CLICK SELECTOR PROBE ===")
+        all_buttons = await page.eval_on_selector_all("button", """els => els.map(e => ({
+            text: (e.innerText || '').trim(),
+            aria: e.getAttribute('aria-label') || '',
+        }))""")
+        print(f"Total buttons after click: {len(all_buttons)}")
+        for btn in all_buttons:
+            if btn["text"] or btn["aria"]:
+                print(f"  button: text='{btn['text'][:50]}' aria='{btn['aria']}'")
+
+        # Every probe in one round-trip
+        found = await page.evaluate("""probes => probes.map(([label, sel, text]) =>
+            Array.from(document.querySelectorAll(sel)).some(e =>
+                !text || (e.textContent || '').toLowerCase().includes(text.toLowerCase())))
+        """, probe_sels)
+        for (label, _, _), hit in zip(probe_sels, found):
+            if hit:
+                print(f"  FOUND: {label}")
     else:
         print("Timed out waiting for generation.")
         await page.screenshot(path="screenshot_grok_timeout.png")
 
-    print("\nBrowser stays open 30 seconds...")
-    await asyncio.sleep(30)
+    if HOLD:
+        print(f"\nBrowser stays open {HOLD} seconds...")
+        await asyncio.sleep(HOLD)
     await ctx.close()
     await pw.stop()
 
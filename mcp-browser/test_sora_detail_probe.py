@@ -1,119 +1,159 @@
 """Probe the Sora detail page to find download methods for video without watermark."""
 
 import asyncio
-from pathlib import Path
-from playwright.async_api import async_playwright
+import os
 
+from launched_browser import get_shared_context, close_shared_context, open_page
+from page_objects import SoraDetailPage
 
-async def test():
-    pw = await async_playwright().start()
-    user_data = Path.home() / ".smi-browser"
-
-    ctx = await pw.chromium.launch_persistent_context(
-        user_data_dir=str(user_data),
-        headless=False,
-        viewport={"width": 1280, "height": 900},
-        accept_downloads=True,
-        args=["--disable-blink-features=AutomationControlled"],
-    )
+# Seconds to keep the browser open at the end for inspection (0 = exit immediately)
+HOLD = int(os.getenv("SMI_DEBUG_HOLD", "0"))
 
-    page = await ctx.new_page()
-    await page.goto("https://sora.chatgpt.com/d/gen_01khs6rs71fg598q3gvvfpjpjd", wait_until="domcontentloaded")
-    await asyncio.sleep(5)
+
+async def probe(ctx):
+    """Run this probe in a new page of an already-open context."""
+    page = await open_page(ctx, "https://sora.chatgpt.com/d/gen_01khs6rs71fg598q3gvvfpjpjd", SoraDetailPage.TOOLBAR_BUTTON)
     print(f"URL: {page.url}")
 
-    # Dump all buttons
-    buttons = await page.query_selector_all("button")
+    # Dump all buttons, links and videos in one round-trip
+    dump = await page.evaluate("""() => {
+        const box = e => {
+            const r = e.getBoundingClientRect();
+            return { x: r.x, y: r.y, w: r.width, h: r.height };
+        };
+        return {
+            buttons: Array.from(document.querySelectorAll('button')).map(b => ({
+                text: (b.innerText || '').trim(),
+                aria: b.getAttribute('aria-label') || '',
+                title: b.getAttribute('title') || '',
+                box: box(b),
+            })),
+            links: Array.from(document.querySelectorAll('a')).map(a => ({
+                text: (a.innerText || '').trim(),
+                href: a.getAttribute('href') || '',
+                download: a.getAttribute('download'),
+            })),
+            videos: Array.from(document.querySelectorAll('video')).map(v => ({
+                src: v.getAttribute('src') || '',
+                poster: v.getAttribute('poster') || '',
+                sources: Array.from(v.querySelectorAll('source')).map(s => ({
+                    src: s.getAttribute('src') || '',
+                    type: s.getAttribute('type') || '',
+                })),
+            })),
+            // Leaf elements whose own text mentions "download", found by
+            // walking text nodes instead of visiting every element
+            downloadTexts: (() => {
+                const found = [];
+                const walk = document.createTreeWalker(document.body, NodeFilter.SHOW_TEXT);
+                let node;
+                while (node = walk.nextNode()) {
+                    const e = node.parentElement;
+                    if (!e || e.childNodes.length !== 1) continue;
+                    const text = node.textContent.trim();
+                    if (!text.toLowerCase().includes('download')) continue;
+                    found.push({
+                        tag: e.tagName,
+                        text,
+                        role: e.getAttribute('role') || '',
+                        cls: (e.className || '').toString().slice(0, 60),
+                    });
+                }
+                return found;
+            })(),
+        };
+    }""")
+
+    buttons = dump["buttons"]
     print(f"\n=== All buttons ({len(buttons)}) ===")
     for i, btn in enumerate(buttons):
-        text = (await btn.evaluate("e => e.innerText.trim()")) or ""
-        aria = await btn.get_attribute("aria-label") or ""
-        title = await btn.get_attribute("title") or ""
-        box = await btn.bounding_box()
-        pos = f"{box['x']:.0f},{box['y']:.0f} {box['width']:.0f}x{box['height']:.0f}" if box else "hidden"
+        text, aria, title, box = btn["text"], btn["aria"], btn["title"], btn["box"]
+        pos = f"{box['x']:.0f},{box['y']:.0f} {box['w']:.0f}x{box['h']:.0f}" if box["w"] or box["h"] else "hidden"
         if text or aria or title:
             print(f"  [{i}] text='{text[:50]}' aria='{aria}' title='{title}' pos={pos}")
 
-    # Dump all links
-    links = await page.query_selector_all("a")
+    links = dump["links"]
     print(f"\n=== All links ({len(links)}) ===")
     for i, link in enumerate(links):
-        text = (await link.evaluate("e => e.innerText.trim()")) or ""
-        href = await link.get_attribute("href") or ""
-        download = await link.get_attribute("download")
+        text, href, download = link["text"], link["href"], link["download"]
         if text or href:
             print(f"  [{i}] text='{text[:50]}' href='{href[:80]}' download={download}")
 
-    # Look for video elements
-    videos = await page.query_selector_all("video")
+    videos = dump["videos"]
     print(f"\n=== Video elements ({len(videos)}) ===")
     for i, vid in enumerate(videos):
-        src = await vid.get_attribute("src") or ""
-        poster = await vid.get_attribute("poster") or ""
-        sources = await vid.query_selector_all("source")
-        print(f"  [{i}] src='{src[:100]}' poster='{poster[:80]}' sources={len(sources)}")
+        sources = vid["sources"]
+        print(f"  [{i}] src='{vid['src'][:100]}' poster='{vid['poster'][:80]}' sources={len(sources)}")
         for s in sources:
-            s_src = await s.get_attribute("src") or ""
-            s_type = await s.get_attribute("type") or ""
-            print(f"    source: src='{s_src[:100]}' type='{s_type}'")
+            print(f"    source: src='{s['src'][:100]}' type='{s['type']}'")
 
     # Look for any menu items with "download" text
     print("\n=== Elements containing 'download' text ===")
-    all_els = await page.query_selector_all("*")
-    for el in all_els:
-        try:
-            text = await el.evaluate("e => e.childNodes.length === 1 && e.childNodes[0].nodeType === 3 ? e.textContent.trim() : ''")
-            if text and "download" in text.lower():
-                tag = await el.evaluate("e => e.tagName")
-                cls = await el.evaluate("e => (e.className || '').toString().slice(0, 60)")
-                role = await el.get_attribute("role") or ""
-                print(f"  <{tag}> text='{text}' role='{role}' class='{cls}'")
-        except:
-            pass
+    for el in dump["downloadTexts"]:
+        print(f"  <{el['tag']}> text='{el['text']}' role='{el['role']}' class='{el['cls']}'")
 
     # Now try clicking the three-dot / more options button
     print("\n=== Trying to open menus ===")
-    for aria in ["More", "More options", "Options", "Menu"]:
-        btn = await page.query_selector(f'button[aria-label="{aria}"]')
-        if btn:
-            print(f"Found button aria-label='{aria}', clicking...")
-            await btn.click()
-            await asyncio.sleep(2)
-
-            # Dump menu items that appeared
-            menuitems = await page.query_selector_all('[role="menuitem"], [role="option"]')
-            print(f"  Menu items: {len(menuitems)}")
-            for mi in menuitems:
-                text = (await mi.evaluate("e => e.innerText.trim()")) or ""
-                print(f"    menuitem: '{text}'")
-
-            # Also check for any new popover/dropdown
-            new_buttons = await page.query_selector_all("button")
-            for nb in new_buttons:
-                text = (await nb.evaluate("e => e.innerText.trim()")) or ""
-                if text and text not in [await b.evaluate("e => e.innerText.trim()") for b in buttons[:5]]:
-                    if "download" in text.lower() or "video" in text.lower() or "watermark" in text.lower():
-                        print(f"    new button: '{text}'")
-
-            await page.screenshot(path="sora_detail_menu_open.png")
-            break
+    # First present label, found in one round-trip
+    aria = await page.evaluate(
+        "labels => labels.find(l => document.querySelector(`button[aria-label=\"${l}\"]`)) ?? null",
+        ["More", "More options", "Options", "Menu"],
+    )
+    if aria:
+        print(f"Found button aria-label='{aria}', clicking...")
+        await page.click(f'button[aria-label="{aria}"]')
+        # Wait for the menu to open rather than a fixed delay
+        try:
+            await page.wait_for_selector('[role="menuitem"], [role="option"]', timeout=5_000)
+        except Exception:
+            pass
+
+        # Dump menu items that appeared
+        menuitems = await page.eval_on_selector_all(
+            '[role="menuitem"], [role="option"]', "els => els.map(e => (e.innerText || '').trim())"
+        )
+        print(f"  Menu items: {len(menuitems)}")
+        for text in menuitems:
+            print(f"    menuitem: '{text}'")
+
+        # Also check for any new popover/dropdown
+        new_button_texts = await page.eval_on_selector_all(
+            "button", "els => els.map(e => (e.innerText || '').trim())"
+        )
+        # Texts of the first few buttons from the initial dump, built once
+        known_texts = {b["text"] for b in buttons[:5]}
+        for text in new_button_texts:
+            if text and text not in known_texts:
+                if "download" in text.lower() or "video" in text.lower() or "watermark" in text.lower():
+                    print(f"    new button: '{text}'")
+
+        await page.screenshot(path="sora_detail_menu_open.png")
 
     # Check for any SVG download icons
     print("\n=== SVG icon buttons (possible download) ===")
-    svg_buttons = await page.query_selector_all("button:has(svg)")
+    svg_buttons = await page.eval_on_selector_all("button:has(svg)", """els => els.map(b => {
+        const r = b.getBoundingClientRect();
+        return {
+            aria: b.getAttribute('aria-label') || '',
+            title: b.getAttribute('title') || '',
+            x: r.x, y: r.y, w: r.width, h: r.height,
+        };
+    })""")
     for i, btn in enumerate(svg_buttons):
-        aria = await btn.get_attribute("aria-label") or ""
-        title = await btn.get_attribute("title") or ""
-        box = await btn.bounding_box()
-        if box and box["width"] < 80:
-            pos = f"{box['x']:.0f},{box['y']:.0f} {box['width']:.0f}x{box['height']:.0f}"
-            print(f"  [{i}] aria='{aria}' title='{title}' pos={pos}")
+        if (btn["w"] or btn["h"]) and btn["w"] < 80:
+            pos = f"{btn['x']:.0f},{btn['y']:.0f} {btn['w']:.0f}x{btn['h']:.0f}"
+            print(f"  [{i}] aria='{btn['aria']}' title='{btn['title']}' pos={pos}")
 
     await page.screenshot(path="sora_detail_probe.png")
-    print("\nBrowser stays open 60s...")
-    await asyncio.sleep(60)
-    await ctx.close()
-    await pw.stop()
+
+
+async def test():
+    await probe(await get_shared_context())
+
+    if HOLD:
+        print(f"\nBrowser stays open {HOLD}s...")
+        await asyncio.sleep(HOLD)
+    await close_shared_context()
 
 
 if __name__ == "__main__":
@@ -1,82 +1,76 @@
 """Probe: click the unlabeled icon buttons on Sora detail page to find download."""
 
 import asyncio
-from pathlib import Path
-from playwright.async_api import async_playwright
+import os
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+from launched_browser import get_shared_context, close_shared_context, open_page
+from page_objects import SoraDetailPage
+
+# Seconds to keep the browser open at the end for inspection (0 = exit immediately)
+HOLD = int(os.getenv("SMI_DEBUG_HOLD", "0"))
+
+
+async def probe(ctx):
+    """Run this probe in a new page of an already-open context."""
+    page = await open_page(ctx, "https://sora.chatgpt.com/d/gen_01khs6rs71fg598q3gvvfpjpjd", SoraDetailPage.TOOLBAR_BUTTON)
+
+    # Filter the icon buttons by position and describe their SVGs in-page, in
+    # one pass: unlabeled ones in the top-right area, plus the one at ~1191,109.
+    # Matches are tagged with data-probe-id so they can be clicked later.
+    candidates = await page.locator("button:has(svg)").evaluate_all("""els => els.flatMap((e, i) => {
+        const r = e.getBoundingClientRect();
+        if (r.width === 0 && r.height === 0) return [];
+        const topRight = r.x > 700 && r.y < 80 && !e.getAttribute('aria-label');
+        const below = Math.abs(r.y - 109) < 20 && r.x > 1100;
+        if (!topRight && !below) return [];
+        e.setAttribute('data-probe-id', String(i));
+        const svg = e.querySelector('svg');
+        const paths = svg ? svg.querySelectorAll('path') : [];
+        const pathData = Array.from(paths).map(p => p.getAttribute('d') || '').join(' ').slice(0, 100);
+        return [{
+            id: i,
+            topRight,
+            x: r.x,
+            y: r.y,
+            svg: svg ? {
+                viewBox: svg.getAttribute('viewBox'),
+                width: svg.getAttribute('width'),
+                height: svg.getAttribute('height'),
+                pathSnippet: pathData,
+                innerHTML: svg.innerHTML.slice(0, 200),
+            } : {},
+        }];
+    })""")
 
-
-async def test():
-    pw = await async_playwright().start()
-    user_data = Path.home() / ".smi-browser"
-
-    ctx = await pw.chromium.launch_persistent_context(
-        user_data_dir=str(user_data),
-        headless=False,
-        viewport={"width": 1280, "height": 900},
-        accept_downloads=True,
-        args=["--disable-blink-features=AutomationControlled"],
-    )
-
-    page = await ctx.new_page()
-    await page.goto("https://sora.chatgpt.com/d/gen_01khs6rs71fg598q3gvvfpjpjd", wait_until="domcontentloaded")
-    await asyncio.sleep(5)
-
-    # Get the unlabeled SVG icon buttons in the top-right area
-    svg_buttons = await page.query_selector_all("button:has(svg)")
     top_right_btns = []
-    for btn in svg_buttons:
-        aria = await btn.get_attribute("aria-label") or ""
-        box = await btn.bounding_box()
-        if box and box["x"] > 700 and box["y"] < 80 and not aria:
-            # Get SVG path data to identify the icon
-            svg_info = await btn.evaluate("""e => {
-                const svg = e.querySelector('svg');
-                if (!svg) return {};
-                const paths = svg.querySelectorAll('path');
-                const pathData = Array.from(paths).map(p => p.getAttribute('d') || '').join(' ').slice(0, 100);
-                return {
-                    viewBox: svg.getAttribute('viewBox'),
-                    width: svg.getAttribute('width'),
-                    height: svg.getAttribute('height'),
-                    pathSnippet: pathData,
-                    innerHTML: svg.innerHTML.slice(0, 200)
-                };
-            }""")
-            pos = f"{box['x']:.0f},{box['y']:.0f}"
-            top_right_btns.append((btn, box, svg_info))
-            print(f"Icon button at {pos}: {svg_info}")
+    for c in candidates:
+        if c["topRight"]:
+            top_right_btns.append(c)
+            print(f"Icon button at {c['x']:.0f},{c['y']:.0f}: {c['svg']}")
 
     print(f"\nFound {len(top_right_btns)} unlabeled icon buttons in top-right area")
 
     # Also check the button at 1191,109 (below the others)
-    for btn in svg_buttons:
-        box = await btn.bounding_box()
-        if box and abs(box["y"] - 109) < 20 and box["x"] > 1100:
-            svg_info = await btn.evaluate("""e => {
-                const svg = e.querySelector('svg');
-                if (!svg) return {};
-                const paths = svg.querySelectorAll('path');
-                const pathData = Array.from(paths).map(p => p.getAttribute('d') || '').join(' ').slice(0, 100);
-                return { pathSnippet: pathData, innerHTML: svg.innerHTML.slice(0, 200) };
-            }""")
-            print(f"\nButton at ~1191,109: {svg_info}")
-            top_right_btns.append((btn, box, svg_info))
+    for c in candidates:
+        if not c["topRight"]:
+            print(f"\nButton at ~1191,109: {c['svg']}")
+            top_right_btns.append(c)
 
     # Try clicking each one and see what happens
-    for i, (btn, box, info) in enumerate(top_right_btns):
-        pos = f"{box['x']:.0f},{box['y']:.0f}"
+    for i, btn in enumerate(top_right_btns):
+        pos = f"{btn['x']:.0f},{btn['y']:.0f}"
         print(f"\n--- Clicking button at {pos} ---")
 
-        # Listen for downloads
-        downloads = []
-        page.on("download", lambda d: downloads.append(d))
-
-        await btn.click()
-        await asyncio.sleep(2)
-
-        if downloads:
-            print(f"  DOWNLOAD triggered! filename: {downloads[0].suggested_filename}")
+        # Wait up to 1.5s for a download; a timeout means this button didn't trigger one
+        try:
+            async with page.expect_download(timeout=1500) as dl_info:
+                await page.click(f'button[data-probe-id="{btn["id"]}"]')
+            download = await dl_info.value
+            print(f"  DOWNLOAD triggered! filename: {download.suggested_filename}")
             continue
+        except PlaywrightTimeoutError:
+            pass
 
         # Check if a menu/popover appeared
         # Look for any new visible text that wasn't there before
@@ -94,23 +88,31 @@ async def test():
                 print(f"    role={item['role']} text='{item['text']}' class='{item['cls']}'")
 
         # Also check for new buttons/items
-        new_items = await page.query_selector_all('[role="menuitem"], [role="option"]')
+        new_items = await page.eval_on_selector_all(
+            '[role="menuitem"], [role="option"]', "els => els.map(e => (e.innerText || '').trim())"
+        )
         if new_items:
             print(f"  Menu items: {len(new_items)}")
-            for mi in new_items:
-                text = (await mi.evaluate("e => e.innerText.trim()")) or ""
+            for text in new_items:
                 print(f"    '{text}'")
 
         await page.screenshot(path=f"sora_detail_click_{i}.png")
 
         # Close any popover by pressing Escape
         await page.keyboard.press("Escape")
-        await asyncio.sleep(1)
+        try:
+            await page.wait_for_selector('[role="menuitem"]', state="detached", timeout=2_000)
+        except Exception:
+            pass
+
+
+async def test():
+    await probe(await get_shared_context())
 
-    print("\nBrowser stays open 60s...")
-    await asyncio.sleep(60)
-    await ctx.close()
-    await pw.stop()
+    if HOLD:
+        print(f"\nBrowser stays open {HOLD}s...")
+        await asyncio.sleep(HOLD)
+    await close_shared_context()
 
 
 if __name__ == "__main__":
@@ -1,55 +1,42 @@
 """Probe: click the three-dot menu (1205,44) on Sora detail page."""
 
 import asyncio
-from pathlib import Path
-from playwright.async_api import async_playwright
+import os
 
+from launched_browser import get_shared_context, close_shared_context, open_page
+from page_objects import SoraDetailPage
+
+# Seconds to keep the browser open at the end for inspection (0 = exit immediately)
+HOLD = int(os.getenv("SMI_DEBUG_HOLD", "0"))
 
-async def test():
-    pw = await async_playwright().start()
-    user_data = Path.home() / ".smi-browser"
-
-    ctx = await pw.chromium.launch_persistent_context(
-        user_data_dir=str(user_data),
-        headless=False,
-        viewport={"width": 1280, "height": 900},
-        accept_downloads=True,
-        args=["--disable-blink-features=AutomationControlled"],
-    )
 
-    page = await ctx.new_page()
-    await page.goto("https://sora.chatgpt.com/d/gen_01khs6rs71fg598q3gvvfpjpjd", wait_until="domcontentloaded")
-    await asyncio.sleep(5)
+async def probe(ctx):
+    """Run this probe in a new page of an already-open context."""
+    page = await open_page(ctx, "https://sora.chatgpt.com/d/gen_01khs6rs71fg598q3gvvfpjpjd", SoraDetailPage.TOOLBAR_BUTTON)
 
     # Find the three-dot button by its SVG path (three circles)
-    three_dot = None
-    svg_buttons = await page.query_selector_all("button:has(svg)")
-    for btn in svg_buttons:
-        path_data = await btn.evaluate("""e => {
-            const paths = e.querySelectorAll('svg path');
-            return Array.from(paths).map(p => p.getAttribute('d') || '').join(' ');
-        }""")
-        if "M3 12a2" in path_data and "M10 12a2" in path_data:
-            three_dot = btn
-            break
-
-    if not three_dot:
+    three_dot = SoraDetailPage(page).three_dot
+
+    if not await three_dot.count():
         print("Three-dot button not found by SVG path, trying position click")
         await page.mouse.click(1205, 44)
-        await asyncio.sleep(2)
     else:
         print("Found three-dot button, clicking...")
         await three_dot.click()
-        await asyncio.sleep(2)
+
+    # Wait for the menu to open rather than a fixed delay
+    try:
+        await page.wait_for_selector('[role="menu"], [role="menuitem"]', timeout=5_000)
+    except Exception:
+        pass
 
     await page.screenshot(path="sora_detail_threedot_open.png")
 
     # Dump everything that appeared
     print("\n=== Menu items ===")
     for role in ["menuitem", "option", "listitem"]:
-        items = await page.query_selector_all(f'[role="{role}"]')
-        for item in items:
-            text = (await item.evaluate("e => e.innerText.trim()")) or ""
+        texts = await page.eval_on_selector_all(f'[role="{role}"]', "els => els.map(e => (e.innerText || '').trim())")
+        for text in texts:
             print(f"  [{role}] '{text}'")
 
     # Dump any new visible elements with text
@@ -74,17 +61,24 @@ async def test():
 
     # Also just dump all visible text near the click area
     print("\n=== All clickable items currently visible ===")
-    clickables = await page.query_selector_all("button, a, [role='menuitem'], [role='option'], [tabindex]")
+    clickables = await page.locator("button, a, [role='menuitem'], [role='option'], [tabindex]").evaluate_all(
+        """els => els.map(e => {
+            const r = e.getBoundingClientRect();
+            return { text: (e.innerText || '').trim(), x: r.x, y: r.y, w: r.width, h: r.height };
+        })"""
+    )
     for el in clickables:
-        text = (await el.evaluate("e => e.innerText.trim()")) or ""
-        box = await el.bounding_box()
-        if box and text and box["x"] > 900:
-            print(f"  text='{text[:60]}' pos={box['x']:.0f},{box['y']:.0f}")
-
-    print("\nBrowser stays open 60s...")
-    await asyncio.sleep(60)
-    await ctx.close()
-    await pw.stop()
+        if (el["w"] or el["h"]) and el["text"] and el["x"] > 900:
+            print(f"  text='{el['text'][:60]}' pos={el['x']:.0f},{el['y']:.0f}")
+
+
+async def test():
+    await probe(await get_shared_context())
+
+    if HOLD:
+        print(f"\nBrowser stays open {HOLD}s...")
+        await asyncio.sleep(HOLD)
+    await close_shared_context()
 
 
 if __name__ == "__main__":
@@ -1,41 +1,47 @@
 """Probe: dump ALL interactive elements on Sora detail page, then click three dots."""
 
 import asyncio
-from pathlib import Path
-from playwright.async_api import async_playwright
+import os
 
+from launched_browser import get_shared_context, close_shared_context, open_page
+from page_objects import SoraDetailPage, get_visible_text
 
-async def test():
-    pw = await async_playwright().start()
-    user_data = Path.home() / ".smi-browser"
+# Seconds to keep the browser open at the end for inspection (0 = exit immediately)
+HOLD = int(os.getenv("SMI_DEBUG_HOLD", "0"))
+
+
+async def probe(ctx):
+    """Run this probe in a new page of an already-open context."""
+    page = await open_page(ctx, "https://sora.chatgpt.com/d/gen_01khs6rs71fg598q3gvvfpjpjd", SoraDetailPage.TOOLBAR_BUTTON)
 
-    ctx = await pw.chromium.launch_persistent_context(
-        user_data_dir=str(user_data),
-        headless=False,
-        viewport={"width": 1280, "height": 900},
-        accept_downloads=True,
-        args=["--disable-blink-features=AutomationControlled"],
-    )
+    # Read every button once — attributes, box and SVG shape — and tag each
+    # with data-probe-id so the chosen one can be clicked without re-querying
+    all_buttons = await page.evaluate("""() => Array.from(document.querySelectorAll('button')).map((b, i) => {
+        b.setAttribute('data-probe-id', String(i));
+        const r = b.getBoundingClientRect();
+        const svg = b.querySelector('svg');
+        const shapes = svg ? svg.querySelectorAll('path, circle, line') : [];
+        return {
+            id: i,
+            aria: b.getAttribute('aria-label') || '',
+            text: (b.innerText || '').trim(),
+            hasSvg: !!svg,
+            svgId: Array.from(shapes).map(p => (p.getAttribute('d') || p.getAttribute('cx') || '')).join('|').slice(0, 80),
+            svgInner: svg ? svg.innerHTML : '',
+            x: r.x, y: r.y, w: r.width, h: r.height,
+        };
+    })""")
 
-    page = await ctx.new_page()
-    await page.goto("https://sora.chatgpt.com/d/gen_01khs6rs71fg598q3gvvfpjpjd", wait_until="domcontentloaded")
-    await asyncio.sleep(5)
+    def pos(btn):
+        return f"{btn['x']:.0f},{btn['y']:.0f} {btn['w']:.0f}x{btn['h']:.0f}" if btn["w"] or btn["h"] else "hidden"
 
     # Dump ALL buttons with SVG analysis
-    svg_buttons = await page.query_selector_all("button:has(svg)")
+    svg_buttons = [btn for btn in all_buttons if btn["hasSvg"]]
     print(f"=== All SVG buttons ({len(svg_buttons)}) ===")
     three_dot_btn = None
     for i, btn in enumerate(svg_buttons):
-        box = await btn.bounding_box()
-        aria = await btn.get_attribute("aria-label") or ""
-        text = (await btn.evaluate("e => e.innerText.trim()")) or ""
-        svg_id = await btn.evaluate("""e => {
-            const paths = e.querySelectorAll('svg path, svg circle, svg line');
-            const d = Array.from(paths).map(p => (p.getAttribute('d') || p.getAttribute('cx') || '')).join('|').slice(0, 80);
-            return d;
-        }""")
-        pos = f"{box['x']:.0f},{box['y']:.0f} {box['width']:.0f}x{box['height']:.0f}" if box else "hidden"
-        print(f"  [{i}] pos={pos} aria='{aria}' text='{text[:30]}' svg='{svg_id}'")
+        svg_id = btn["svgId"]
+        print(f"  [{i}] pos={pos(btn)} aria='{btn['aria']}' text='{btn['text'][:30]}' svg='{svg_id}'")
 
         # Identify three dots: three circles pattern or three "a2" arcs
         if svg_id and ("M3 12a2" in svg_id or svg_id.count("a2") >= 3 or svg_id.count("12") >= 3):
@@ -43,21 +49,15 @@ async def test():
             print(f"       ^^^ This looks like three-dot menu!")
 
     # Also dump non-SVG buttons
-    all_buttons = await page.query_selector_all("button")
     print(f"\n=== All buttons ({len(all_buttons)}) ===")
     for i, btn in enumerate(all_buttons):
-        box = await btn.bounding_box()
-        aria = await btn.get_attribute("aria-label") or ""
-        text = (await btn.evaluate("e => e.innerText.trim()")) or ""
-        pos = f"{box['x']:.0f},{box['y']:.0f} {box['width']:.0f}x{box['height']:.0f}" if box else "hidden"
-        has_svg = await btn.evaluate("e => !!e.querySelector('svg')")
-        print(f"  [{i}] pos={pos} aria='{aria}' text='{text[:40]}' svg={has_svg}")
+        print(f"  [{i}] pos={pos(btn)} aria='{btn['aria']}' text='{btn['text'][:40]}' svg={btn['hasSvg']}")
 
     # Try to find the three-dot by its distinctive SVG pattern
     if not three_dot_btn:
         print("\nLooking harder for three-dot button...")
         for btn in svg_buttons:
-            inner = await btn.evaluate("e => e.querySelector('svg').innerHTML")
+            inner = btn["svgInner"]
             if "12a2" in inner or ("M3" in inner and "M10" in inner and "M17" in inner):
                 three_dot_btn = btn
                 print("Found by innerHTML match!")
@@ -65,26 +65,17 @@ async def test():
 
     if three_dot_btn:
         print("\nClicking three-dot button...")
-        await three_dot_btn.click()
-        await asyncio.sleep(2)
+        await page.click(f'button[data-probe-id="{three_dot_btn["id"]}"]')
+        # Wait for the menu to open rather than a fixed delay
+        try:
+            await page.wait_for_selector('[role="menuitem"]', timeout=5_000)
+        except Exception:
+            pass
         await page.screenshot(path="sora_detail_menu.png")
 
         # Dump everything visible
-        all_text = await page.evaluate("""() => {
-            const result = [];
-            const walk = document.createTreeWalker(document.body, NodeFilter.SHOW_TEXT);
-            let node;
-            while (node = walk.nextNode()) {
-                const t = node.textContent.trim();
-                if (t && t.length > 1 && t.length < 50) {
-                    const rect = node.parentElement.getBoundingClientRect();
-                    if (rect.width > 0 && rect.height > 0) {
-                        result.push({ text: t, x: Math.round(rect.x), y: Math.round(rect.y) });
-                    }
-                }
-            }
-            return result.filter(r => r.x > 800 || r.y > 50).slice(0, 30);
-        }""")
+        items = await get_visible_text(page, max_len=50)
+        all_text = [r for r in items if r["x"] > 800 or r["y"] > 50][:30]
         print("\nVisible text after clicking three-dot:")
         for item in all_text:
             print(f"  '{item['text']}' at {item['x']},{item['y']}")
@@ -92,10 +83,14 @@ async def test():
         print("\nCould not find three-dot button at all!")
         await page.screenshot(path="sora_detail_no_threedot.png")
 
-    print("\nBrowser stays open 60s...")
-    await asyncio.sleep(60)
-    await ctx.close()
-    await pw.stop()
+
+async def test():
+    await probe(await get_shared_context())
+
+    if HOLD:
+        print(f"\nBrowser stays open {HOLD}s...")
+        await asyncio.sleep(HOLD)
+    await close_shared_context()
 
 
 if __name__ == "__main__":
@@ -1,45 +1,25 @@
 """Probe: click three dots -> Download -> see submenu options."""
 
 import asyncio
-from pathlib import Path
-from playwright.async_api import async_playwright
+import os
 
+from launched_browser import get_shared_context, close_shared_context, open_page
+from page_objects import SoraDetailPage, get_visible_text
+
+# Seconds to keep the browser open at the end for inspection (0 = exit immediately)
+HOLD = int(os.getenv("SMI_DEBUG_HOLD", "0"))
 
-async def test():
-    pw = await async_playwright().start()
-    user_data = Path.home() / ".smi-browser"
-
-    ctx = await pw.chromium.launch_persistent_context(
-        user_data_dir=str(user_data),
-        headless=False,
-        viewport={"width": 1280, "height": 900},
-        accept_downloads=True,
-        args=["--disable-blink-features=AutomationControlled"],
-    )
-
-    page = await ctx.new_page()
-    await page.goto("https://sora.chatgpt.com/d/gen_01khs6rs71fg598q3gvvfpjpjd", wait_until="domcontentloaded")
-    await asyncio.sleep(5)
-
-    # Find and click three-dot button (SVG with three circles: M3 12a2...M10...M17)
-    svg_buttons = await page.query_selector_all("button:has(svg)")
-    three_dot = None
-    for btn in svg_buttons:
-        inner = await btn.evaluate("e => e.querySelector('svg') ? e.querySelector('svg').innerHTML : ''")
-        if "M3 12a2" in inner and "m7 0a2" in inner:
-            three_dot = btn
-            break
-
-    if not three_dot:
-        print("Three-dot not found!")
-        await asyncio.sleep(30)
-        await ctx.close()
-        await pw.stop()
-        return
 
+async def probe(ctx):
+    """Run this probe in a new page of an already-open context."""
+    page = await open_page(ctx, "https://sora.chatgpt.com/d/gen_01khs6rs71fg598q3gvvfpjpjd", SoraDetailPage.TOOLBAR_BUTTON)
+
+    # Open the three-dot menu
     print("Clicking three-dot menu...")
-    await three_dot.click()
-    await asyncio.sleep(2)
+    sora = SoraDetailPage(page)
+    if not await sora.open_menu():
+        print("Three-dot not found!")
+        return
 
     # Click "Download"
     download_item = page.get_by_text("Download", exact=True)
@@ -47,47 +27,34 @@ async def test():
     print(f"'Download' items: {count}")
 
     if count > 0:
+        # Collect any download the click triggers directly, from the click on
+        downloads = []
+        page.on("download", downloads.append)
+
         await download_item.first.click()
-        await asyncio.sleep(2)
+        # Continue as soon as the Download submenu renders
+        await sora.wait_for_menuitem("Video")
         await page.screenshot(path="sora_detail_download_submenu.png")
 
         # Dump what appeared after clicking Download
-        all_text = await page.evaluate("""() => {
-            const result = [];
-            const walk = document.createTreeWalker(document.body, NodeFilter.SHOW_TEXT);
-            let node;
-            while (node = walk.nextNode()) {
-                const t = node.textContent.trim();
-                if (t && t.length > 1 && t.length < 80) {
-                    const rect = node.parentElement.getBoundingClientRect();
-                    if (rect.width > 0 && rect.height > 0 && rect.x > 800) {
-                        result.push({
-                            text: t,
-                            x: Math.round(rect.x),
-                            y: Math.round(rect.y),
-                            tag: node.parentElement.tagName,
-                            role: node.parentElement.getAttribute('role') || ''
-                        });
-                    }
-                }
-            }
-            return result;
-        }""")
+        items = await get_visible_text(page)
+        all_text = [r for r in items if r["x"] > 800]
         print("\nVisible text after clicking Download:")
         for item in all_text:
             print(f"  '{item['text']}' at {item['x']},{item['y']} <{item['tag']}> role={item['role']}")
 
         # Also check if a download was directly triggered
-        downloads = []
-        page.on("download", lambda d: downloads.append(d))
-        await asyncio.sleep(3)
         if downloads:
             print(f"\nDirect download triggered: {downloads[0].suggested_filename}")
 
-    print("\nBrowser stays open 60s...")
-    await asyncio.sleep(60)
-    await ctx.close()
-    await pw.stop()
+
+async def test():
+    await probe(await get_shared_context())
+
+    if HOLD:
+        print(f"\nBrowser stays open {HOLD}s...")
+        await asyncio.sleep(HOLD)
+    await close_shared_context()
 
 
 if __name__ == "__main__":
@@ -1,46 +1,50 @@
-"""Test: three dots -> Download -> Video (no watermark) -> save file."""
+"""Test: save the video via its direct src, else three dots -> Download -> Video (no watermark)."""
 
 import asyncio
+import os
 from pathlib import Path
-from playwright.async_api import async_playwright
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
 
+from launched_browser import get_shared_context, close_shared_context, open_page, download_video_src
+from page_objects import SoraDetailPage
 
-async def test():
-    pw = await async_playwright().start()
-    user_data = Path.home() / ".smi-browser"
-
-    ctx = await pw.chromium.launch_persistent_context(
-        user_data_dir=str(user_data),
-        headless=False,
-        viewport={"width": 1280, "height": 900},
-        accept_downloads=True,
-        args=["--disable-blink-features=AutomationControlled"],
-    )
+# Seconds to keep the browser open at the end for inspection (0 = exit immediately)
+HOLD = int(os.getenv("SMI_DEBUG_HOLD", "0"))
+# Also list every open tab when the download doesn't arrive
+DEBUG = bool(os.getenv("SMI_DEBUG"))
 
-    page = await ctx.new_page()
-    await page.goto("https://sora.chatgpt.com/d/gen_01khs6rs71fg598q3gvvfpjpjd", wait_until="domcontentloaded")
-    await asyncio.sleep(5)
 
-    # Find three-dot button
-    svg_buttons = await page.query_selector_all("button:has(svg)")
-    three_dot = None
-    for btn in svg_buttons:
-        inner = await btn.evaluate("e => e.querySelector('svg') ? e.querySelector('svg').innerHTML : ''")
-        if "M3 12a2" in inner and "m7 0a2" in inner:
-            three_dot = btn
-            break
+async def test():
+    ctx = await get_shared_context()
+
+    # Media kept: the video itself (src or menu download) has to load
+    page = await open_page(
+        ctx,
+        "https://sora.chatgpt.com/d/gen_01khs6rs71fg598q3gvvfpjpjd",
+        SoraDetailPage.TOOLBAR_BUTTON,
+        keep_media=True,
+    )
 
-    if not three_dot:
-        print("Three-dot not found!")
-        await asyncio.sleep(30)
-        await ctx.close()
-        await pw.stop()
+    # Fast path: download the <video> src directly; the menu flow below is
+    # only the fallback when the page exposes no http src
+    out = await download_video_src(page, Path(__file__).parent / "test_output" / "panda_video.mp4")
+    if out:
+        print(f"Downloaded video src directly: {out.stat().st_size:,} bytes -> {out}")
+        if HOLD:
+            await asyncio.sleep(HOLD)
+        await close_shared_context()
         return
+    print("No http video src, falling back to the three-dot menu")
 
     # Click three-dot
     print("1. Clicking three-dot menu...")
-    await three_dot.click()
-    await asyncio.sleep(2)
+    sora = SoraDetailPage(page)
+    if not await sora.open_menu():
+        print("Three-dot not found!")
+        if HOLD:
+            await asyncio.sleep(HOLD)
+        await close_shared_context()
+        return
 
     # Click "Download" menuitem
     print("2. Clicking Download...")
@@ -50,51 +54,39 @@ async def test():
         await download_item.first.click()
     else:
         await download_item.click()
-    await asyncio.sleep(2)
+    # Continue as soon as the Download submenu renders
+    await sora.wait_for_menuitem("Video")
 
     # Now click "Video" menuitem (NO watermark) — it's the one with role="menuitem"
     print("3. Clicking Video (no watermark)...")
 
-    # Get all menuitems with text "Video"
-    video_items = await page.query_selector_all('[role="menuitem"]')
-    video_btn = None
-    for item in video_items:
-        text = (await item.evaluate("e => e.innerText.trim()")) or ""
-        if text == "Video":
-            video_btn = item
-            print(f"   Found menuitem: '{text}'")
-            break
+    video_btn = sora.menuitem("Video")
+    if await video_btn.count():
+        print("   Found menuitem: 'Video'")
+    else:
+        video_btn = None
 
     if not video_btn:
         print("   Video menuitem not found, trying get_by_text...")
         # There are two "Video" texts - one is a label, one is the menuitem
         # The menuitem one is what we want
         all_video = page.get_by_text("Video", exact=True)
-        count = await all_video.count()
-        print(f"   Found {count} 'Video' elements")
-        for i in range(count):
-            role = await all_video.nth(i).get_attribute("role")
-            text = await all_video.nth(i).inner_text()
+        # Role and text of every match in one read
+        matches = await all_video.evaluate_all("els => els.map(e => [e.getAttribute('role'), e.innerText])")
+        print(f"   Found {len(matches)} 'Video' elements")
+        for i, (role, text) in enumerate(matches):
             print(f"   [{i}] role={role} text='{text}'")
             if role == "menuitem":
-                video_btn = await all_video.nth(i).element_handle()
+                video_btn = all_video.nth(i)
                 break
 
     if video_btn:
-        # Listen for download event
-        download_event = asyncio.Future()
-
-        def on_download(dl):
-            if not download_event.done():
-                download_event.set_result(dl)
-
-        page.on("download", on_download)
-
-        await video_btn.click()
-        print("   Clicked! Waiting for download...")
-
         try:
-            dl = await asyncio.wait_for(download_event, timeout=60)
+            # Listener is attached around the click, so the event can't be missed
+            async with page.expect_download(timeout=60_000) as dl_info:
+                await video_btn.click()
+                print("   Clicked! Waiting for download...")
+            dl = await dl_info.value
             print(f"   Download started: {dl.suggested_filename}")
             out_path = str(Path(__file__).parent / "test_output" / "panda_video.mp4")
             Path(out_path).parent.mkdir(parents=True, exist_ok=True)
@@ -102,21 +94,21 @@ async def test():
             size = Path(out_path).stat().st_size
             print(f"   Saved to: {out_path}")
             print(f"   File size: {size:,} bytes")
-        except asyncio.TimeoutError:
+        except PlaywrightTimeoutError:
             print("   No download event after 60s")
-            # Maybe it opened in a new tab?
-            pages = ctx.pages
-            print(f"   Open pages: {len(pages)}")
-            for p in pages:
-                print(f"     {p.url[:80]}")
+            if DEBUG:
+                # Maybe it opened in a new tab?
+                print(f"   Open pages: {len(ctx.pages)}")
+                for p in ctx.pages:
+                    print(f"     {p.url[:80]}")
     else:
         print("   Could not find Video button!")
         await page.screenshot(path="sora_download_no_video_btn.png")
 
-    print("\nBrowser stays open 30s...")
-    await asyncio.sleep(30)
-    await ctx.close()
-    await pw.stop()
+    if HOLD:
+        print(f"\nBrowser stays open {HOLD}s...")
+        await asyncio.sleep(HOLD)
+    await close_shared_context()
 
 
 if __name__ == "__main__":
@@ -1,97 +1,80 @@
-"""Test: three dots -> Download -> Video (no watermark) using coordinate clicks."""
+"""Test: save the video via its direct src, else three dots -> Download -> Video, clicking menu items by role."""
 
 import asyncio
+import os
 from pathlib import Path
-from playwright.async_api import async_playwright
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
 
+from launched_browser import get_shared_context, close_shared_context, open_page, download_video_src
+from page_objects import SoraDetailPage, get_menu_items
 
-async def test():
-    pw = await async_playwright().start()
-    user_data = Path.home() / ".smi-browser"
-
-    ctx = await pw.chromium.launch_persistent_context(
-        user_data_dir=str(user_data),
-        headless=False,
-        viewport={"width": 1280, "height": 900},
-        accept_downloads=True,
-        args=["--disable-blink-features=AutomationControlled"],
-    )
+# Seconds to keep the browser open at the end for inspection (0 = exit immediately)
+HOLD = int(os.getenv("SMI_DEBUG_HOLD", "0"))
+# Also list every open tab when the download doesn't arrive
+DEBUG = bool(os.getenv("SMI_DEBUG"))
 
-    page = await ctx.new_page()
-    await page.goto("https://sora.chatgpt.com/d/gen_01khs6rs71fg598q3gvvfpjpjd", wait_until="domcontentloaded")
-    await asyncio.sleep(5)
 
-    # Find three-dot button
-    svg_buttons = await page.query_selector_all("button:has(svg)")
-    three_dot = None
-    for btn in svg_buttons:
-        inner = await btn.evaluate("e => e.querySelector('svg') ? e.querySelector('svg').innerHTML : ''")
-        if "M3 12a2" in inner and "m7 0a2" in inner:
-            three_dot = btn
-            break
+async def test():
+    ctx = await get_shared_context()
+
+    # Media kept: the video itself (src or menu download) has to load
+    page = await open_page(
+        ctx,
+        "https://sora.chatgpt.com/d/gen_01khs6rs71fg598q3gvvfpjpjd",
+        SoraDetailPage.TOOLBAR_BUTTON,
+        keep_media=True,
+    )
 
-    if not three_dot:
-        print("Three-dot not found!")
-        await asyncio.sleep(30)
-        await ctx.close()
-        await pw.stop()
+    # Fast path: download the <video> src directly; the menu flow below is
+    # only the fallback when the page exposes no http src
+    out = await download_video_src(page, Path(__file__).parent / "test_output" / "panda_video.mp4")
+    if out:
+        print(f"Downloaded video src directly: {out.stat().st_size:,} bytes -> {out}")
+        if HOLD:
+            await asyncio.sleep(HOLD)
+        await close_shared_context()
         return
+    print("No http video src, falling back to the three-dot menu")
 
     # Click three-dot
+    sora = SoraDetailPage(page)
     print("1. Clicking three-dot menu...")
-    await three_dot.click()
-    await asyncio.sleep(2)
+    if not await sora.open_menu():
+        print("Three-dot not found!")
+        if HOLD:
+            await asyncio.sleep(HOLD)
+        await close_shared_context()
+        return
 
     # Click "Download" using the menuitem
     print("2. Clicking Download...")
-    dl_item = await page.query_selector('[role="menuitem"]:has-text("Download")')
-    if dl_item:
-        # Get position and use mouse.click to avoid overlay issues
-        box = await dl_item.bounding_box()
-        if box:
-            await page.mouse.click(box["x"] + box["width"] / 2, box["y"] + box["height"] / 2)
-            print(f"   Clicked at {box['x'] + box['width']/2:.0f},{box['y'] + box['height']/2:.0f}")
-    await asyncio.sleep(2)
+    if await sora.click_menuitem("Download", exact=False):
+        print("   Clicked Download")
+    # Continue as soon as the Download submenu renders
+    await sora.wait_for_menuitem("Video")
 
     # Now find and click "Video" menuitem (no watermark)
     print("3. Looking for Video option...")
 
-    # Dump what's visible now
-    video_items = await page.query_selector_all('[role="menuitem"]')
-    for item in video_items:
-        text = (await item.evaluate("e => e.innerText.trim()")) or ""
-        box = await item.bounding_box()
-        pos = f"{box['x']:.0f},{box['y']:.0f}" if box else "hidden"
-        print(f"   menuitem: '{text}' at {pos}")
-
-    # Find the "Video" menuitem and click by coordinates
-    video_btn = None
-    for item in video_items:
-        text = (await item.evaluate("e => e.innerText.trim()")) or ""
-        if text == "Video":
-            video_btn = item
-            break
-
-    if video_btn:
-        box = await video_btn.bounding_box()
-        if box:
-            print(f"   Found 'Video' at {box['x']:.0f},{box['y']:.0f}")
-
-            # Set up download listener before clicking
-            download_event = asyncio.Future()
-
-            def on_download(dl):
-                if not download_event.done():
-                    download_event.set_result(dl)
+    # Dump what's visible now; the same read locates "Video" below
+    item_info = await get_menu_items(page)
+    for item in item_info:
+        pos = f"{item['x']:.0f},{item['y']:.0f}" if item["w"] or item["h"] else "hidden"
+        print(f"   menuitem: '{item['text']}' at {pos}")
 
-            page.on("download", on_download)
+    # Find the "Video" menuitem
+    video_btn = next((m for m in item_info if m["text"] == "Video"), None)
 
-            # Click by coordinates to avoid overlay interception
-            await page.mouse.click(box["x"] + box["width"] / 2, box["y"] + box["height"] / 2)
-            print("   Clicked! Waiting for download...")
+    if video_btn:
+        if video_btn["w"] or video_btn["h"]:
+            print(f"   Found 'Video' at {video_btn['x']:.0f},{video_btn['y']:.0f}")
 
             try:
-                dl = await asyncio.wait_for(download_event, timeout=60)
+                # Listener is attached around the click, so the event can't be missed
+                async with page.expect_download(timeout=60_000) as dl_info:
+                    await sora.click_menuitem("Video")
+                    print("   Clicked! Waiting for download...")
+                dl = await dl_info.value
                 print(f"   Download started: {dl.suggested_filename}")
                 out_path = str(Path(__file__).parent / "test_output" / "panda_video.mp4")
                 Path(out_path).parent.mkdir(parents=True, exist_ok=True)
@@ -99,23 +82,23 @@ async def test():
                 size = Path(out_path).stat().st_size
                 print(f"   Saved to: {out_path}")
                 print(f"   File size: {size:,} bytes")
-            except asyncio.TimeoutError:
+            except PlaywrightTimeoutError:
                 print("   No download event after 60s")
-                # Check for new tabs
-                pages = ctx.pages
-                print(f"   Open pages: {len(pages)}")
-                for p in pages:
-                    print(f"     {p.url[:100]}")
+                if DEBUG:
+                    # Check for new tabs
+                    print(f"   Open pages: {len(ctx.pages)}")
+                    for p in ctx.pages:
+                        print(f"     {p.url[:100]}")
         else:
             print("   Video button has no bounding box (hidden?)")
     else:
         print("   No 'Video' menuitem found!")
         await page.screenshot(path="sora_download_debug.png")
 
-    print("\nBrowser stays open 30s...")
-    await asyncio.sleep(30)
-    await ctx.close()
-    await pw.stop()
+    if HOLD:
+        print(f"\nBrowser stays open {HOLD}s...")
+        await asyncio.sleep(HOLD)
+    await close_shared_context()
 
 
 if __name__ == "__main__":
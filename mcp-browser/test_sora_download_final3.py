@@ -1,123 +1,116 @@
-"""Test: try both approaches - direct video src download AND menu click with popup handling."""
+"""Test: download Sora videos by direct src, a few tabs at once, falling back to the menu click."""
 
 import asyncio
+import os
+import sys
 from pathlib import Path
-from playwright.async_api import async_playwright
 
+from launched_browser import get_shared_context, close_shared_context, open_page, download_video_src
+from page_objects import SoraDetailPage
 
-async def test():
-    pw = await async_playwright().start()
-    user_data = Path.home() / ".smi-browser"
-
-    ctx = await pw.chromium.launch_persistent_context(
-        user_data_dir=str(user_data),
-        headless=False,
-        viewport={"width": 1280, "height": 900},
-        accept_downloads=True,
-        args=["--disable-blink-features=AutomationControlled"],
-    )
-
-    page = await ctx.new_page()
-    await page.goto("https://sora.chatgpt.com/d/gen_01khs6rs71fg598q3gvvfpjpjd", wait_until="domcontentloaded")
-    await asyncio.sleep(5)
-
-    # ── Approach A: Get video src URL directly ──
-    print("=== Approach A: Direct video src ===")
-    video = await page.query_selector("video")
-    if video:
-        src = await video.get_attribute("src") or ""
-        print(f"Video src: {src[:120]}...")
-        if src.startswith("http"):
-            # Download it directly
-            out_a = str(Path(__file__).parent / "test_output" / "panda_direct.mp4")
-            Path(out_a).parent.mkdir(parents=True, exist_ok=True)
-            response = await page.request.get(src)
-            content = await response.body()
-            Path(out_a).write_bytes(content)
-            size = Path(out_a).stat().st_size
-            print(f"Downloaded directly: {size:,} bytes -> {out_a}")
+# Seconds to keep the browser open at the end for inspection (0 = exit immediately)
+HOLD = int(os.getenv("SMI_DEBUG_HOLD", "0"))
+# Also list every open tab when the download doesn't arrive
+DEBUG = bool(os.getenv("SMI_DEBUG"))
 
-    # ── Approach B: Menu click with popup/download handling ──
-    print("\n=== Approach B: Three-dot -> Download -> Video ===")
-
-    # Find three-dot button
-    svg_buttons = await page.query_selector_all("button:has(svg)")
-    three_dot = None
-    for btn in svg_buttons:
-        inner = await btn.evaluate("e => e.querySelector('svg') ? e.querySelector('svg').innerHTML : ''")
-        if "M3 12a2" in inner and "m7 0a2" in inner:
-            three_dot = btn
-            break
-
-    if three_dot:
-        await three_dot.click()
-        await asyncio.sleep(2)
-
-        # Hover over "Download" to trigger submenu
-        dl_item = await page.query_selector('[role="menuitem"]:has-text("Download")')
-        if dl_item:
-            box = await dl_item.bounding_box()
-            if box:
-                # Hover first, then click
-                await page.mouse.move(box["x"] + box["width"] / 2, box["y"] + box["height"] / 2)
-                await asyncio.sleep(0.5)
-                await page.mouse.click(box["x"] + box["width"] / 2, box["y"] + box["height"] / 2)
-                await asyncio.sleep(2)
-
-        # Find "Video" menuitem
-        video_items = await page.query_selector_all('[role="menuitem"]')
-        video_btn = None
-        for item in video_items:
-            text = (await item.evaluate("e => e.innerText.trim()")) or ""
-            if text == "Video":
-                video_btn = item
-                break
-
-        if video_btn:
-            box = await video_btn.bounding_box()
-            if box:
-                # Set up ALL event listeners
-                downloads = []
-                popups = []
-                page.on("download", lambda d: downloads.append(d))
-                ctx.on("page", lambda p: popups.append(p))
-
-                # Also try intercepting the network request
-                requests_log = []
-                page.on("request", lambda r: requests_log.append(r.url) if "video" in r.url.lower() or "download" in r.url.lower() else None)
-
-                # Click with force
-                await video_btn.click(force=True)
-                await asyncio.sleep(5)
-
-                print(f"Downloads triggered: {len(downloads)}")
-                print(f"Popups/new pages: {len(popups)}")
-                print(f"Video/download requests: {len(requests_log)}")
-
-                if downloads:
-                    dl = downloads[0]
-                    out_b = str(Path(__file__).parent / "test_output" / "panda_menu.mp4")
-                    await dl.save_as(out_b)
-                    size = Path(out_b).stat().st_size
-                    print(f"Menu download: {size:,} bytes -> {out_b}")
-
-                if popups:
-                    for p in popups:
-                        print(f"New page URL: {p.url[:100]}")
-
-                for url in requests_log[:5]:
-                    print(f"Request: {url[:120]}")
+# Detail pages to fetch when none are given on the command line
+DEFAULT_URLS = ["https://sora.chatgpt.com/d/gen_01khs6rs71fg598q3gvvfpjpjd"]
+
+# Videos downloaded at once; more just competes for the same connection
+MAX_PARALLEL = 4
+
+
+async def fetch_one(url, ctx, slots):
+    """Download the video on one detail page, falling back to the menu flow."""
+    async with slots:
+        # Media kept: the video itself (src or menu download) has to load
+        page = await open_page(ctx, url, SoraDetailPage.TOOLBAR_BUTTON, keep_media=True)
+        gen_id = url.rstrip("/").rsplit("/", 1)[-1]
+
+        # ── Approach A: Get video src URL directly ──
+        out_a = await download_video_src(page, Path(__file__).parent / "test_output" / f"{gen_id}_direct.mp4")
+        if out_a:
+            print(f"[{gen_id}] Downloaded directly: {out_a.stat().st_size:,} bytes -> {out_a}")
+            return out_a
 
+        print(f"[{gen_id}] No direct src, trying the menu")
+        return await menu_download(ctx, page, gen_id)
+
+
+async def menu_download(ctx, page, gen_id):
+    """Three-dot -> Download -> Video on an open detail page; the saved Path or None."""
+    # ── Approach B: Menu click with popup/download handling ──
+    sora = SoraDetailPage(page)
+    if await sora.open_menu():
+
+        # Click "Download" to open its submenu
+        if await sora.click_menuitem("Download", exact=False):
+            # Continue as soon as the Download submenu renders
+            await sora.wait_for_menuitem("Video")
+
+        video_btn = sora.menuitem("Video")
+
+        if await video_btn.count():
+            # Set up ALL event listeners
+            downloads = []
+            popups = []
+            page.on("download", lambda d: downloads.append(d))
+            ctx.on("page", lambda p: popups.append(p))
+
+            # Also try intercepting the network request
+            requests_log = []
+            page.on("request", lambda r: requests_log.append(r.url) if "video" in r.url.lower() or "download" in r.url.lower() else None)
+
+            # Click with force
+            await video_btn.click(force=True)
+            # Return as soon as a download starts; the listeners above catch the rest
+            try:
+                await page.wait_for_event("download", timeout=5_000)
+            except Exception:
+                pass
+
+            print(f"Downloads triggered: {len(downloads)}")
+            print(f"Popups/new pages: {len(popups)}")
+            print(f"Video/download requests: {len(requests_log)}")
+
+            if downloads:
+                dl = downloads[0]
+                out_b = Path(__file__).parent / "test_output" / f"{gen_id}_menu.mp4"
+                await dl.save_as(out_b)
+                print(f"Menu download: {out_b.stat().st_size:,} bytes -> {out_b}")
+                return out_b
+
+            if popups:
+                for p in popups:
+                    print(f"New page URL: {p.url[:100]}")
+
+            for url in requests_log[:5]:
+                print(f"Request: {url[:120]}")
+
+            if DEBUG:
                 # Check all open pages
-                all_pages = ctx.pages
-                print(f"\nAll open pages: {len(all_pages)}")
-                for p in all_pages:
+                print(f"\nAll open pages: {len(ctx.pages)}")
+                for p in ctx.pages:
                     print(f"  {p.url[:100]}")
 
-    print("\nBrowser stays open 30s...")
-    await asyncio.sleep(30)
-    await ctx.close()
-    await pw.stop()
+    return None
+
+
+async def test():
+    ctx = await get_shared_context()
+    urls = sys.argv[1:] or DEFAULT_URLS
+
+    # Tabs share the one context; downloads overlap up to MAX_PARALLEL
+    print(f"=== Fetching {len(urls)} video(s) ===")
+    slots = asyncio.Semaphore(MAX_PARALLEL)
+    results = await asyncio.gather(*(fetch_one(u, ctx, slots) for u in urls), return_exceptions=True)
+    for url, result in zip(urls, results):
+        print(f"  {url} -> {result}")
+
+    if HOLD:
+        print(f"\nBrowser stays open {HOLD}s...")
+        await asyncio.sleep(HOLD)
+    await close_shared_context()
 
 
 if __name__ == "__main__":
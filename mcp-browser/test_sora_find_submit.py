@@ -1,51 +1,48 @@
 """Probe: type master prompt then dump all nearby buttons to find the right submit."""
 
 import asyncio
-from pathlib import Path
-from playwright.async_api import async_playwright
+import os
 
+from launched_browser import get_shared_context, close_shared_context, open_page
+
+# Seconds to keep the browser open at the end for inspection (0 = exit immediately)
+HOLD = int(os.getenv("SMI_DEBUG_HOLD", "0"))
 
-async def test():
-    pw = await async_playwright().start()
-    user_data = Path.home() / ".smi-browser"
 
-    ctx = await pw.chromium.launch_persistent_context(
-        user_data_dir=str(user_data),
-        headless=False,
-        viewport={"width": 1280, "height": 900},
-        args=["--disable-blink-features=AutomationControlled"],
-    )
+async def test():
+    ctx = await get_shared_context()
 
-    page = await ctx.new_page()
-    await page.goto("https://sora.chatgpt.com/storyboard", wait_until="domcontentloaded")
-    await asyncio.sleep(5)
+    page = await open_page(ctx, "https://sora.chatgpt.com/storyboard", "textarea")
 
     # Type prompt into the master prompt textarea
     textarea = await page.query_selector('textarea[placeholder*="Describe your video"]')
     if textarea:
         await textarea.click()
         await textarea.fill("a baby panda eating bamboo in a zen garden")
-        await asyncio.sleep(1)
         print("Prompt typed into master prompt textarea")
     else:
         print("ERROR: No master prompt textarea found")
 
     # Dump every button on the page
-    buttons = await page.query_selector_all("button")
+    buttons = await page.locator("button").evaluate_all("""els => els.map(e => {
+        const r = e.getBoundingClientRect();
+        return {
+            text: (e.innerText || '').trim(),
+            aria: e.getAttribute('aria-label') || '',
+            disabled: e.disabled || e.getAttribute('aria-disabled') === 'true',
+            x: r.x, y: r.y, w: r.width, h: r.height,
+        };
+    })""")
     print(f"\nAll buttons on page ({len(buttons)}):")
     for i, btn in enumerate(buttons):
-        text = (await btn.evaluate("e => e.innerText.trim()")) or ""
-        aria = await btn.get_attribute("aria-label") or ""
-        disabled = await btn.is_disabled()
-        box = await btn.bounding_box()
-        pos = f"{box['x']:.0f},{box['y']:.0f} {box['width']:.0f}x{box['height']:.0f}" if box else "hidden"
-        print(f"  [{i}] text='{text[:40]}' aria='{aria}' disabled={disabled} pos={pos}")
+        pos = f"{btn['x']:.0f},{btn['y']:.0f} {btn['w']:.0f}x{btn['h']:.0f}" if btn["w"] or btn["h"] else "hidden"
+        print(f"  [{i}] text='{btn['text'][:40]}' aria='{btn['aria']}' disabled={btn['disabled']} pos={pos}")
 
     await page.screenshot(path="sora_find_submit.png")
-    print("\nBrowser stays open 60s...")
-    await asyncio.sleep(60)
-    await ctx.close()
-    await pw.stop()
+    if HOLD:
+        print(f"\nBrowser stays open {HOLD}s...")
+        await asyncio.sleep(HOLD)
+    await close_shared_context()
 
 
 if __name__ == "__main__":
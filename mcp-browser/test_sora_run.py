@@ -1,16 +1,30 @@
-"""Test: run sora.py's generate_sora_video directly."""
+"""Test: run sora.py's generate_sora_video directly.
+
+Prompts given on the command line run back to back in this one process,
+so they share browser.py's context and pay for the Chromium launch once.
+"""
 
 import asyncio
+import sys
+from browser import shutdown, start_warmup
 from sora import generate_sora_video
 
+DEFAULT_PROMPT = "a baby panda eating bamboo in a zen garden with cherry blossoms falling gently"
+
 async def main():
-    result = await generate_sora_video(
-        prompt="a baby panda eating bamboo in a zen garden with cherry blossoms falling gently",
-        output_path="test_output/panda_video.mp4",
-        duration=25,
-        aspect_ratio="9:16",
-    )
-    print(f"\nResult: {result}")
+    prompts = sys.argv[1:] or [DEFAULT_PROMPT]
+    start_warmup()  # Launch the browser while the first call sets up
+    try:
+        for i, prompt in enumerate(prompts):
+            result = await generate_sora_video(
+                prompt=prompt,
+                output_path=f"test_output/panda_video{i or ''}.mp4",
+                duration=25,
+                aspect_ratio="9:16",
+            )
+            print(f"\nResult: {result}")
+    finally:
+        await shutdown()
 
 if __name__ == "__main__":
     asyncio.run(main())
@@ -1,32 +1,26 @@
 """Sora Step 1: Navigate to storyboard, type prompt, set params, click Create."""
 
 import asyncio
-from pathlib import Path
-from playwright.async_api import async_playwright
+import os
 
+from launched_browser import get_shared_context, close_shared_context, open_page
+
+# Seconds to keep the browser open at the end for inspection (0 = exit immediately)
+HOLD = int(os.getenv("SMI_DEBUG_HOLD", "0"))
 
-async def test():
-    pw = await async_playwright().start()
-    user_data = Path.home() / ".smi-browser"
 
-    ctx = await pw.chromium.launch_persistent_context(
-        user_data_dir=str(user_data),
-        headless=False,
-        viewport={"width": 1280, "height": 900},
-        args=["--disable-blink-features=AutomationControlled"],
-    )
+async def test():
+    ctx = await get_shared_context()
 
-    page = await ctx.new_page()
     print("Opening sora.chatgpt.com/storyboard...")
-    await page.goto("https://sora.chatgpt.com/storyboard", wait_until="domcontentloaded")
-    await asyncio.sleep(5)
+    page = await open_page(ctx, "https://sora.chatgpt.com/storyboard", "textarea")
     print(f"URL: {page.url}")
 
     if "login" in page.url:
         print("NOT LOGGED IN — need to log in first")
-        await asyncio.sleep(30)
-        await ctx.close()
-        await pw.stop()
+        if HOLD:
+            await asyncio.sleep(HOLD)
+        await close_shared_context()
         return
 
     await page.screenshot(path="sora_step1_loaded.png")
@@ -42,30 +36,39 @@ async def test():
     if textarea:
         await textarea.click()
         await textarea.fill("a baby panda eating bamboo in a zen garden with cherry blossoms falling")
-        await asyncio.sleep(1)
         print("Prompt typed")
 
     await page.screenshot(path="sora_step1_typed.png")
 
     # Check for aspect ratio and duration buttons
-    for label in ["Portrait", "Landscape", "Square", "5s", "10s", "15s", "20s"]:
-        btn = await page.query_selector(f'button:has-text("{label}")')
-        if btn:
-            is_pressed = await btn.evaluate("e => e.getAttribute('aria-pressed') || e.getAttribute('data-state') || ''")
+    # One pass over the buttons for every label, matched like :has-text()
+    labels = ["Portrait", "Landscape", "Square", "5s", "10s", "15s", "20s"]
+    states = await page.evaluate("""labels => {
+        const buttons = Array.from(document.querySelectorAll('button'));
+        return labels.map(label => {
+            const b = buttons.find(e => (e.innerText || '').toLowerCase().includes(label.toLowerCase()));
+            return b ? (b.getAttribute('aria-pressed') || b.getAttribute('data-state') || '') : null;
+        });
+    }""", labels)
+    for label, is_pressed in zip(labels, states):
+        if is_pressed is not None:
             print(f"  Button '{label}' found (state: {is_pressed})")
 
     # Click Portrait (9:16 for reels)
     portrait_btn = await page.query_selector('button:has-text("Portrait")')
     if portrait_btn:
         await portrait_btn.click()
-        await asyncio.sleep(0.5)
         print("Clicked Portrait")
 
     # Click 10s duration
     dur_btn = await page.query_selector('button:has-text("10s")')
     if dur_btn:
         await dur_btn.click()
-        await asyncio.sleep(0.5)
+        # Wait for the duration popover rather than a fixed delay
+        try:
+            await page.get_by_text("25 seconds").first.wait_for(state="visible", timeout=5_000)
+        except Exception:
+            pass
         print("Clicked 10s")
 
     await page.screenshot(path="sora_step1_params_set.png")
@@ -82,10 +85,10 @@ async def test():
         print(f"  text='{text}' disabled={disabled}")
 
     # DON'T click Create yet — just showing what we found
-    print("\nStep 1 complete. Everything looks good? Browser stays open 30s...")
-    await asyncio.sleep(30)
-    await ctx.close()
-    await pw.stop()
+    if HOLD:
+        print(f"\nStep 1 complete. Everything looks good? Browser stays open {HOLD}s...")
+        await asyncio.sleep(HOLD)
+    await close_shared_context()
 
 
 if __name__ == "__main__":
@@ -1,223 +1,294 @@
 """Sora Steps 1-7: Open storyboard, set duration, type prompt, submit,
-wait for scene cards, click Create, navigate to drafts."""
+wait for scene cards, click Create, navigate to drafts.
 
-import asyncio
-from pathlib import Path
-from playwright.async_api import async_playwright
-
-
-async def test():
-    pw = await async_playwright().start()
-    user_data = Path.home() / ".smi-browser"
-
-    ctx = await pw.chromium.launch_persistent_context(
-        user_data_dir=str(user_data),
-        headless=False,
-        viewport={"width": 1280, "height": 900},
-        accept_downloads=True,
-        args=["--disable-blink-features=AutomationControlled"],
-    )
-
-    page = await ctx.new_page()
+Prompts given on the command line each get a run, in the same browser."""
 
+import asyncio
+import os
+import sys
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+from config import SORA_DRAFTS_URL, SORA_STORYBOARD_URL, SORA_DRAFT_POLL_INTERVAL_S
+from launched_browser import get_shared_context, close_shared_context, open_page
+from sora import (
+    CREATE_BUTTON_SEL,
+    DRAFT_CHECK_INTERVAL_MS,
+    DRAFT_LINK_SEL,
+    DURATION_BUTTON_SEL,
+    MASTER_PROMPT_SEL,
+    SCENE_CARDS_SEL,
+    _NEW_DRAFT_HREF_JS,
+)
+
+# Seconds to keep the browser open at the end for inspection (0 = exit immediately)
+HOLD = int(os.getenv("SMI_DEBUG_HOLD", "0"))
+# Also screenshot each step on the happy path; failures always get one
+DEBUG = bool(os.getenv("SMI_DEBUG"))
+
+# The master prompt's submit button, by label or text, in one query
+SUBMIT_BUTTON_SEL = 'button[aria-label="Submit"], button:has-text("Submit")'
+
+# Longest the drafts page goes without a reload once its tile count stalls
+MAX_RELOAD_INTERVAL_S = 120
+
+# Used when no prompts are given on the command line
+DEFAULT_PROMPT = "a baby panda eating bamboo in a zen garden with cherry blossoms falling gently"
+
+
+async def _heartbeat(page, shot_prefix: str) -> None:
+    """Print progress (and in DEBUG, save a screenshot) every minute until cancelled."""
+    elapsed = 0
+    while True:
+        await asyncio.sleep(60)
+        elapsed += 60
+        print(f"  Still waiting... ({elapsed}s elapsed)")
+        if DEBUG:
+            await page.screenshot(path=f"{shot_prefix}_{elapsed}s.png")
+
+
+async def _snapshot_drafts(ctx) -> set[str]:
+    """Draft hrefs already on /drafts, read in a tab of their own."""
+    # A separate tab, so the storyboard keeps its state
+    drafts_tab = await open_page(ctx, SORA_DRAFTS_URL, DRAFT_LINK_SEL)
+    try:
+        # Every href in one round-trip
+        return set(await drafts_tab.locator(DRAFT_LINK_SEL).evaluate_all(
+            "els => els.map(e => e.getAttribute('href')).filter(Boolean)"
+        ))
+    finally:
+        await drafts_tab.close()
+
+
+async def run_once(ctx, prompt: str) -> str | None:
+    """Run steps 1-7 for one prompt in a new page of ctx; the new draft's href or None."""
     # ── Step 1: Open storyboard ──
     print("Step 1: Opening storyboard...")
-    await page.goto("https://sora.chatgpt.com/storyboard", wait_until="domcontentloaded")
-    await asyncio.sleep(5)
-    print(f"  URL: {page.url}")
-
-    if "login" in page.url:
-        print("NOT LOGGED IN — log in first")
-        await asyncio.sleep(30)
-        await ctx.close()
-        await pw.stop()
-        return
-
-    # ── Step 2: Set duration to 25s ──
-    print("Step 2: Setting duration to 25s...")
-    dur_btn = None
-    for label in ["10s", "5s", "15s", "20s", "25s"]:
-        dur_btn = await page.query_selector(f'button:has-text("{label}")')
-        if dur_btn:
-            print(f"  Found duration button: '{label}'")
-            break
-
-    if dur_btn:
-        await dur_btn.click()
-        await asyncio.sleep(1)
-        loc = page.get_by_text("25 seconds", exact=True)
-        if await loc.count() > 0:
-            await loc.first.click()
-            await asyncio.sleep(1)
-            print("  Selected '25 seconds'")
+    page = await open_page(ctx, SORA_STORYBOARD_URL, "textarea")
+    try:
+        print(f"  URL: {page.url}")
+
+        if "login" in page.url:
+            print("NOT LOGGED IN — log in first")
+            return None
+
+        # ── Step 2: Set duration to 25s ──
+        print("Step 2: Setting duration to 25s...")
+        # Whichever duration label is showing, matched in one query
+        dur_btn = page.locator(DURATION_BUTTON_SEL).first
+        option = page.get_by_text("25 seconds", exact=True).first
+        if await dur_btn.count():
+            print("  Found duration button")
+            await dur_btn.click()
+            try:
+                # Auto-waits for the popover option to be visible and clickable
+                await option.click(timeout=5_000)
+                print("  Selected '25 seconds'")
+            except PlaywrightTimeoutError:
+                print("  ERROR: Could not find '25 seconds' option")
+                await page.screenshot(path="sora_test_dur_fail.png")
         else:
-            print("  ERROR: Could not find '25 seconds' option")
-            await page.screenshot(path="sora_test_dur_fail.png")
-    else:
-        print("  ERROR: No duration button found")
-
-    # ── Step 3: Type master prompt (bottom input: "Describe your video...") ──
-    print("Step 3: Typing master prompt...")
-    textarea = await page.query_selector('textarea[placeholder*="Describe your video"]')
-    if not textarea:
-        # Dump all textareas to debug
-        all_ta = await page.query_selector_all("textarea")
-        print(f"  Could not find 'Describe your video' textarea. Found {len(all_ta)} textareas:")
-        for i, ta in enumerate(all_ta):
-            ph = await ta.get_attribute("placeholder") or ""
-            print(f"    [{i}] placeholder='{ph}'")
-        await page.screenshot(path="sora_test_no_master_prompt.png")
-        await asyncio.sleep(30)
-        await ctx.close()
-        await pw.stop()
-        return
-
-    placeholder = await textarea.get_attribute("placeholder") or ""
-    print(f"  Found master prompt textarea: '{placeholder}'")
-    await textarea.click()
-    await textarea.fill("a baby panda eating bamboo in a zen garden with cherry blossoms falling gently")
-    await asyncio.sleep(1)
-    print("  Prompt typed")
-
-    # ── Step 4: Click Submit for master prompt ──
-    print("Step 4: Clicking Submit...")
-    submit_btn = await page.query_selector('button[aria-label="Submit"]')
-    if not submit_btn:
-        submit_btn = await page.query_selector('button:has-text("Submit")')
-    if not submit_btn:
-        # Dump all buttons to find the right one
-        buttons = await page.query_selector_all("button")
-        print(f"  No Submit button found. Listing all {len(buttons)} buttons:")
-        for btn in buttons:
-            text = (await btn.evaluate("e => e.innerText.trim()")) or ""
-            aria = await btn.get_attribute("aria-label") or ""
-            if text or aria:
-                print(f"    text='{text[:40]}' aria='{aria}'")
-        await page.screenshot(path="sora_test_no_submit.png")
-        await asyncio.sleep(30)
-        await ctx.close()
-        await pw.stop()
-        return
-
-    await submit_btn.click()
-    print("  Submitted!")
-    await asyncio.sleep(3)
-    await page.screenshot(path="sora_test_after_submit.png")
-
-    # ── Step 5: Wait for storyboard scene cards (5+ min) ──
-    print("Step 5: Waiting for storyboard scene cards (up to 10 min)...")
-    deadline = asyncio.get_event_loop().time() + 600  # 10 min max
-    found_scenes = False
-    poll_count = 0
-    while asyncio.get_event_loop().time() < deadline:
-        poll_count += 1
-
-        # Check for "Scene 1" text
-        loc = page.get_by_text("Scene 1")
-        count = await loc.count()
-        if count > 0:
-            print(f"  Scene cards detected after {poll_count * 5}s!")
-            found_scenes = True
-            break
-
-        # Also check for scene-related elements
-        scenes = await page.query_selector_all('[class*="scene"], [data-testid*="scene"]')
-        if len(scenes) >= 1:
-            print(f"  Scene elements detected after {poll_count * 5}s!")
+            print("  ERROR: No duration button found")
+
+        # ── Step 3: Type master prompt (bottom input: "Describe your video...") ──
+        print("Step 3: Typing master prompt...")
+        textarea = await page.query_selector(MASTER_PROMPT_SEL)
+        if not textarea:
+            # Dump all textareas to debug
+            placeholders = await page.eval_on_selector_all(
+                "textarea", "els => els.map(e => e.getAttribute('placeholder') || '')"
+            )
+            print(f"  Could not find 'Describe your video' textarea. Found {len(placeholders)} textareas:")
+            for i, ph in enumerate(placeholders):
+                print(f"    [{i}] placeholder='{ph}'")
+            await page.screenshot(path="sora_test_no_master_prompt.png")
+            return None
+
+        placeholder = await textarea.get_attribute("placeholder") or ""
+        print(f"  Found master prompt textarea: '{placeholder}'")
+        await textarea.click()
+        await textarea.fill(prompt)
+        print("  Prompt typed")
+
+        # ── Step 4: Click Submit for master prompt ──
+        print("Step 4: Clicking Submit...")
+        submit_btn = await page.query_selector(SUBMIT_BUTTON_SEL)
+        if not submit_btn:
+            # Dump all buttons to find the right one
+            buttons = await page.eval_on_selector_all("button", """els => els.map(e => ({
+                text: (e.innerText || '').trim(),
+                aria: e.getAttribute('aria-label') || '',
+            }))""")
+            print(f"  No Submit button found. Listing all {len(buttons)} buttons:")
+            for btn in buttons:
+                if btn["text"] or btn["aria"]:
+                    print(f"    text='{btn['text'][:40]}' aria='{btn['aria']}'")
+            await page.screenshot(path="sora_test_no_submit.png")
+            return None
+
+        # Proceed once Sora has answered the submit, and report if it refused.
+        # A timeout before the click went through means nothing was submitted
+        clicked = False
+        try:
+            async with page.expect_response(
+                lambda r: r.request.method == "POST" and "sora.chatgpt.com" in r.url,
+                timeout=15_000,
+            ) as submit_info:
+                await submit_btn.click()
+                clicked = True
+            submit_resp = await submit_info.value
+            print(f"  Submitted! (HTTP {submit_resp.status})")
+            if not submit_resp.ok:
+                print(f"  WARNING: submit request failed: {submit_resp.url[:100]}")
+        except PlaywrightTimeoutError:
+            if not clicked:
+                print("  ERROR: Submit button could not be clicked")
+                await page.screenshot(path="sora_test_submit_click_fail.png")
+                return None
+            print("  Submitted! (no POST response seen within 15s)")
+        # Step 6's drafts snapshot loads in its own tab while the scenes generate;
+        # no draft is created until Create is clicked
+        drafts_task = asyncio.create_task(_snapshot_drafts(ctx))
+        if DEBUG:
+            await page.screenshot(path="sora_test_after_submit.png")
+
+        # ── Step 5: Wait for storyboard scene cards (5+ min) ──
+        print("Step 5: Waiting for storyboard scene cards (up to 10 min)...")
+        # One wait that resolves as soon as a "Scene 1" label or scene element
+        # appears; a side task logs progress each minute
+        heartbeat = asyncio.create_task(_heartbeat(page, "sora_test_waiting"))
+        try:
+            await page.locator(SCENE_CARDS_SEL).first.wait_for(state="attached", timeout=600_000)  # 10 min max
+            print("  Scene cards detected!")
             found_scenes = True
-            break
-
-        if poll_count % 12 == 0:  # Every 60s
-            elapsed = poll_count * 5
-            print(f"  Still waiting... ({elapsed}s elapsed)")
-            await page.screenshot(path=f"sora_test_waiting_{elapsed}s.png")
-
-        await asyncio.sleep(5)
-
-    if not found_scenes:
-        print("  WARNING: Timed out waiting for scene cards. Taking screenshot...")
-        await page.screenshot(path="sora_test_scene_timeout.png")
-
-    await page.screenshot(path="sora_test_scenes_ready.png")
-
-    # ── Step 6: Snapshot existing drafts ──
-    print("Step 6: Getting existing drafts list...")
-    # Open a new tab to check drafts without losing storyboard state
-    drafts_tab = await ctx.new_page()
-    await drafts_tab.goto("https://sora.chatgpt.com/drafts", wait_until="domcontentloaded")
-    await asyncio.sleep(3)
-    existing_links = await drafts_tab.query_selector_all('a[href^="/d/"]')
-    existing_hrefs = set()
-    for link in existing_links:
-        href = await link.get_attribute("href")
-        if href:
-            existing_hrefs.add(href)
-    print(f"  Existing drafts: {len(existing_hrefs)}")
-    await drafts_tab.close()
-
-    # ── Step 6b: Click Create ──
-    print("Step 6b: Clicking Create...")
-    create_btn = await page.query_selector('button:has-text("Create")')
-    if not create_btn:
-        create_btn = await page.query_selector('button[aria-label="Create"]')
-    if create_btn:
-        text = await create_btn.evaluate("e => e.innerText.trim()")
-        disabled = await create_btn.is_disabled()
-        print(f"  Create button: text='{text}' disabled={disabled}")
-        if not disabled:
-            await create_btn.click()
-            print("  Clicked Create!")
-            await asyncio.sleep(5)
+        except PlaywrightTimeoutError:
+            found_scenes = False
+        finally:
+            heartbeat.cancel()
+
+        if not found_scenes:
+            print("  WARNING: Timed out waiting for scene cards. Taking screenshot...")
+            await page.screenshot(path="sora_test_scene_timeout.png")
+        elif DEBUG:
+            await page.screenshot(path="sora_test_scenes_ready.png")
+
+        # ── Step 6: Snapshot existing drafts ──
+        print("Step 6: Getting existing drafts list...")
+        existing_hrefs = await drafts_task
+        print(f"  Existing drafts: {len(existing_hrefs)}")
+
+        # ── Step 6b: Click Create ──
+        print("Step 6b: Clicking Create...")
+        create_btn = await page.query_selector(CREATE_BUTTON_SEL)
+        if create_btn:
+            text = await create_btn.evaluate("e => e.innerText.trim()")
+            disabled = await create_btn.is_disabled()
+            print(f"  Create button: text='{text}' disabled={disabled}")
+            if not disabled:
+                # Let the create request reach Sora before navigating away
+                clicked = False
+                try:
+                    async with page.expect_response(
+                        lambda r: r.request.method == "POST" and "sora.chatgpt.com" in r.url,
+                        timeout=15_000,
+                    ):
+                        await create_btn.click()
+                        clicked = True
+                    print("  Clicked Create!")
+                except PlaywrightTimeoutError:
+                    if not clicked:
+                        print("  ERROR: Create button could not be clicked")
+                        await page.screenshot(path="sora_test_create_click_fail.png")
+                        return None
+                    print("  Clicked Create! (no POST response seen within 15s)")
+            else:
+                print("  ERROR: Create button is disabled")
+                await page.screenshot(path="sora_test_create_disabled.png")
         else:
-            print("  ERROR: Create button is disabled")
-            await page.screenshot(path="sora_test_create_disabled.png")
-    else:
-        print("  ERROR: No Create button found")
-        await page.screenshot(path="sora_test_no_create.png")
-
-    await page.screenshot(path="sora_test_after_create.png")
-
-    # ── Step 7: Navigate to /drafts and wait for new video ──
-    print("Step 7: Navigating to drafts, waiting for new video (up to 15 min)...")
-    await page.goto("https://sora.chatgpt.com/drafts", wait_until="domcontentloaded")
-    await asyncio.sleep(3)
-
-    draft_deadline = asyncio.get_event_loop().time() + 900  # 15 min
-    new_draft = None
-    draft_poll = 0
-    while asyncio.get_event_loop().time() < draft_deadline:
-        draft_poll += 1
-        current_links = await page.query_selector_all('a[href^="/d/"]')
-        current_hrefs = []
-        for link in current_links:
-            href = await link.get_attribute("href")
-            if href:
-                current_hrefs.append(href)
-
-        new_hrefs = [h for h in current_hrefs if h not in existing_hrefs]
-        if new_hrefs:
-            new_draft = new_hrefs[0]
-            print(f"  New draft found after {draft_poll * 30}s: {new_draft}")
-            break
-
-        if draft_poll % 2 == 0:
-            elapsed = draft_poll * 30
-            print(f"  Still waiting for draft... ({elapsed}s, {len(current_hrefs)} total drafts)")
-
-        await page.reload(wait_until="domcontentloaded")
-        await asyncio.sleep(30)
-
-    if new_draft:
-        print(f"\nSUCCESS: Steps 1-7 complete! New draft at: {new_draft}")
-    else:
-        print("\nTIMEOUT: No new draft appeared within 15 minutes")
+            print("  ERROR: No Create button found")
+            await page.screenshot(path="sora_test_no_create.png")
+
+        if DEBUG:
+            await page.screenshot(path="sora_test_after_create.png")
+
+        # ── Step 7: Navigate to /drafts and wait for new video ──
+        print("Step 7: Navigating to drafts, waiting for new video (up to 15 min)...")
+        # Create's POST has been answered by now; if the app already routed to
+        # /drafts there's nothing to load, otherwise navigate without waiting
+        # for the load event since the tiles are waited for directly
+        if "/drafts" not in page.url:
+            await page.goto(SORA_DRAFTS_URL, wait_until="commit")
+        try:
+            await page.wait_for_selector(DRAFT_LINK_SEL, timeout=15_000)
+        except PlaywrightTimeoutError:
+            pass
+
+        # Check the tile list in-page every second for a draft link we haven't
+        # seen. The page is reloaded at most once per poll interval (30s),
+        # backing off to one every MAX_RELOAD_INTERVAL_S while the tile count
+        # stays put, and back to 30s when tiles are added.
+        loop = asyncio.get_running_loop()
+        draft_deadline = loop.time() + 900  # 15 min
+        new_draft = None
+        reload_after = float(SORA_DRAFT_POLL_INTERVAL_S)
+        tile_count = len(existing_hrefs)
+        while (remaining := draft_deadline - loop.time()) > 0:
+            try:
+                # Same check sora.py's poll uses: the first unseen href, or null
+                handle = await page.wait_for_function(
+                    _NEW_DRAFT_HREF_JS,
+                    arg=[DRAFT_LINK_SEL, list(existing_hrefs)],
+                    polling=DRAFT_CHECK_INTERVAL_MS,
+                    timeout=min(reload_after, remaining) * 1000,
+                )
+                new_draft = await handle.json_value()
+                print(f"  New draft found: {new_draft}")
+                break
+            except PlaywrightTimeoutError:
+                pass
+
+            count = await page.locator(DRAFT_LINK_SEL).count()
+            if count > tile_count:
+                reload_after = float(SORA_DRAFT_POLL_INTERVAL_S)
+            else:
+                reload_after = min(reload_after * 1.5, MAX_RELOAD_INTERVAL_S)
+            tile_count = count
+            elapsed = 900 - (draft_deadline - loop.time())
+            print(f"  Still waiting for draft... ({elapsed:.0f}s, {count} total drafts)")
+            await page.reload(wait_until="domcontentloaded")
+
+        if new_draft:
+            print(f"\nSUCCESS: Steps 1-7 complete! New draft at: {new_draft}")
+        else:
+            print("\nTIMEOUT: No new draft appeared within 15 minutes")
 
-    await page.screenshot(path="sora_test_final.png")
-    print("\nBrowser stays open 60s for you to check...")
-    await asyncio.sleep(60)
-    await ctx.close()
-    await pw.stop()
+        if DEBUG or not new_draft:
+            await page.screenshot(path="sora_test_final.png")
+        return new_draft
+    finally:
+        await page.close()
+
+
+async def test():
+    # Prompts run one after another in the one launched browser; Sora
+    # generates a single storyboard at a time, and each run's new draft is
+    # told apart by diffing the drafts list, so runs must not overlap
+    ctx = await get_shared_context()
+    prompts = sys.argv[1:] or [DEFAULT_PROMPT]
+    for prompt in prompts:
+        await run_once(ctx, prompt)
+
+    if HOLD:
+        print(f"\nBrowser stays open {HOLD}s for you to check...")
+        await asyncio.sleep(HOLD)
+    await close_shared_context()
 
 
 if __name__ == "__main__":
-    asyncio.run(test())
+    # uvloop's faster loop carries the Playwright driver pipe when installed;
+    # it's optional, so plain asyncio is the fallback
+    try:
+        import uvloop
+    except ImportError:
+        asyncio.run(test())
+    else:
+        uvloop.run(test())